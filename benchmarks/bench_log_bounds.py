@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Times finding the first/last lines of growing auth logs with read_log_bounds vs a full line scan.
+
+read_log_bounds should stay flat as plain logs grow, gzip logs still have to be decompressed
+but skip splitting and decoding every line.
+
+usage (from the repo root): python -m benchmarks.bench_log_bounds --sizes 10000,1000000
+"""
+
+import datetime as DT
+import gzip
+import tempfile
+import timeit
+from pathlib import Path
+
+import click
+
+from timesheet.util import read_log_bounds
+
+LOG_LINE = (
+    "{dt:%b} {dt.day:>2} {dt:%H:%M:%S} host sshd[1234]: pam_unix(sshd:session): session opened\n"
+)
+
+
+def write_log(logfile: Path, num_lines: int):
+    start = DT.datetime(2021, 1, 1)
+    open_func = gzip.open if logfile.name.endswith(".gz") else open
+    with open_func(logfile, "wt") as fh:  # type: ignore
+        for i in range(num_lines):
+            fh.write(LOG_LINE.format(dt=start + DT.timedelta(seconds=i * 10)))
+
+
+def full_scan(logfile: Path):
+    open_func = gzip.open if logfile.name.endswith(".gz") else open
+    first_line = last_line = None
+    with open_func(logfile, "rt") as fh:  # type: ignore
+        for line in fh:
+            if not line.strip():
+                continue
+            if first_line is None:
+                first_line = line
+            last_line = line
+    return first_line, last_line
+
+
+@click.command()
+@click.option("--sizes", default="10000,100000,1000000", help="comma separated line counts")
+@click.option("--repeat", default=5, help="timing runs per file, best is reported")
+def main(sizes: str, repeat: int):
+    print(f"{'file': <12}\t{'lines': >10}\t{'bounds (ms)': >12}\t{'full scan (ms)': >14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for num_lines in [int(s) for s in sizes.split(",")]:
+            for name in ("auth.log", "auth.log.gz"):
+                logfile = Path(tmp_dir) / name
+                write_log(logfile, num_lines)
+                bounds_t = min(
+                    timeit.repeat(lambda: read_log_bounds(logfile), number=1, repeat=repeat)
+                )
+                scan_t = min(timeit.repeat(lambda: full_scan(logfile), number=1, repeat=repeat))
+                print(
+                    f"{name: <12}\t{num_lines: >10}\t{bounds_t * 1000: >12.3f}\t{scan_t * 1000: >14.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
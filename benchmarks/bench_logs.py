@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Times the log parsing path (index_logs, sync_activity, guess_day, backfill_days) against
+generated auth logs, reporting wall time, lines/sec and peak memory as JSON.
+
+cold runs start from an empty database, warm runs reuse the log index / activity from the
+previous run, the same as running a command twice in a row.
+
+usage (from the repo root):
+    python -m benchmarks.bench_logs --lines 1000000 --days 60 -o results.json
+"""
+
+import datetime as DT
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Optional
+
+import click
+
+from timesheet import __version__, app
+from timesheet.models import Activity, LogIndex, LogWatermark, Timesheet
+from timesheet.sources import open_binary
+
+from .generate_logs import write_auth_logs
+
+
+def count_lines(logfile: Path) -> int:
+    with open_binary(logfile) as fh:
+        return sum(block.count(b"\n") for block in iter(lambda: fh.read(1 << 20), b""))
+
+
+def reset_db(keep_activity: bool = False):
+    """clears timesheet entries, and everything read from the logs unless keep_activity is set"""
+    models = [Timesheet] if keep_activity else [Timesheet, Activity, LogWatermark, LogIndex]
+    for model in models:
+        app.db.session.query(model).delete()
+    app.db.try_commit()
+
+
+def measure(
+    name: str, func: Callable, setup: Callable, num_lines: int, repeat: int, trace_mem: bool
+) -> dict:
+    """runs setup and func repeat times, reporting the best time, then once more for memory use"""
+    times = []
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    peak_mem = None
+    if trace_mem:
+        setup()
+        tracemalloc.start()
+        func()
+        peak_mem = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "name": name,
+        "lines": num_lines,
+        "wall_s": round(best, 6),
+        "mean_s": round(sum(times) / len(times), 6),
+        "lines_per_s": round(num_lines / best) if num_lines and best else None,
+        "peak_mem_mb": round(peak_mem, 3) if peak_mem is not None else None,
+    }
+
+
+def git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    log_dir: Path, db_file: Path, repeat: int, jobs: int, trace_mem: bool
+) -> list[dict]:
+    app.db.connect(db_file)
+    app.db._ensure_db()
+    app.config.log_dir = log_dir
+    app.config.log_glob = None
+
+    reset_db()
+    logfiles = app.get_logs()
+    lines = {logfile: count_lines(logfile) for logfile in logfiles}
+    total_lines = sum(lines.values())
+    index = app.index_logs()
+    # a day from the middle of the logs, so guess_day only reads the files around it
+    mid_log = index[len(index) // 2]
+    guess_target = mid_log.min_date + (mid_log.max_date - mid_log.min_date) // 2
+    guess_lines = sum(lines[a.file] for a in index if a.min_date <= guess_target <= a.max_date)
+
+    cold = reset_db
+    warm = lambda: reset_db(keep_activity=True)  # noqa: E731
+    benchmarks = [
+        ("index_logs (cold)", app.index_logs, cold, total_lines),
+        ("index_logs (warm)", app.index_logs, lambda: None, 0),
+        ("sync_activity (cold)", lambda: app.sync_activity(logfiles), cold, total_lines),
+        ("sync_activity (warm)", lambda: app.sync_activity(logfiles), lambda: None, 0),
+        (
+            "guess_day (cold)",
+            lambda: app.guess_day(guess_target, clock_out=True),
+            cold,
+            guess_lines,
+        ),
+        ("guess_day (warm)", lambda: app.guess_day(guess_target, clock_out=True), warm, 0),
+        ("backfill_days (cold)", lambda: app.backfill_days(jobs=jobs), cold, total_lines),
+        ("backfill_days (warm)", lambda: app.backfill_days(jobs=jobs), warm, 0),
+    ]
+    results = []
+    for name, func, setup, num_lines in benchmarks:
+        result = measure(name, func, setup, num_lines, repeat, trace_mem)
+        click.echo(json.dumps(result), err=True)
+        results.append(result)
+    return results
+
+
+@click.command()
+@click.option("-n", "--lines", "num_lines", default=100000, show_default=True)
+@click.option("-d", "--days", default=30, show_default=True)
+@click.option("-e", "--events-per-day", default=6, show_default=True)
+@click.option("-f", "--files", "num_files", default=5, show_default=True)
+@click.option("-p", "--plain-files", default=2, show_default=True, help="uncompressed files")
+@click.option(
+    "--log-dir",
+    type=click.Path(file_okay=False, exists=True, path_type=Path),
+    help="use existing auth logs instead of generating them",
+)
+@click.option("--repeat", default=3, show_default=True, help="timing runs, best is reported")
+@click.option("-j", "--jobs", default=1, show_default=True, help="backfill processes")
+@click.option("--no-memory", is_flag=True, help="skip the tracemalloc run")
+@click.option("-o", "--output", type=click.Path(dir_okay=False, path_type=Path))
+def main(
+    num_lines: int,
+    days: int,
+    events_per_day: int,
+    num_files: int,
+    plain_files: int,
+    log_dir: Optional[Path],
+    repeat: int,
+    jobs: int,
+    no_memory: bool,
+    output: Optional[Path],
+):
+    logging.basicConfig(level=logging.WARNING)
+    params = {
+        "lines": num_lines,
+        "days": days,
+        "events_per_day": events_per_day,
+        "files": num_files,
+        "plain_files": plain_files,
+        "log_dir": str(log_dir) if log_dir else None,
+        "repeat": repeat,
+        "jobs": jobs,
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if log_dir is None:
+            log_dir = Path(tmp_dir) / "logs"
+            click.echo(f"generating {num_lines} lines of logs in {log_dir}", err=True)
+            write_auth_logs(log_dir, num_lines, days, events_per_day, num_files, plain_files)
+        results = run_benchmarks(log_dir, Path(tmp_dir) / "bench.db", repeat, jobs, not no_memory)
+
+    report = {
+        "version": __version__,
+        "git_rev": git_rev(),
+        "python": platform.python_version(),
+        "timestamp": DT.datetime.now().isoformat(timespec="seconds"),
+        "params": params,
+        "results": results,
+    }
+    report_json = json.dumps(report, indent=2)
+    if output:
+        output.write_text(report_json + "\n")
+    else:
+        print(report_json)
+
+
+if __name__ == "__main__":
+    main()
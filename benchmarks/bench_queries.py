@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Counts the SQL statements run by backfill_days and pto_range over growing date ranges.
+
+both should fetch existing rows for the whole range at once, so the count shouldn't grow with the
+number of days. exits non-zero if it does.
+
+usage (from the repo root): python -m benchmarks.bench_queries --days 30,365
+"""
+
+import datetime as DT
+import logging
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import click
+from sqlalchemy import event
+
+from timesheet import app
+from timesheet.constants import ONE_DAY
+from timesheet.models import Activity, LogIndex, LogWatermark, Timesheet
+
+from .generate_logs import write_auth_logs
+
+
+@contextmanager
+def count_queries() -> Iterator[list[str]]:
+    """collects every statement sent to the database while active"""
+    statements: list[str] = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(app.db.engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(app.db.engine, "before_cursor_execute", before_execute)
+
+
+def reset_db():
+    for model in (Timesheet, Activity, LogWatermark, LogIndex):
+        app.db.session.query(model).delete()
+    app.db.try_commit()
+    app.holiday_dates.cache_clear()
+
+
+def run_counts(log_dir: Path, days: int, num_lines: int) -> dict[str, int]:
+    write_auth_logs(log_dir, num_lines, days, num_files=2, plain_files=1)
+    end = DT.date.today()
+    start = end - DT.timedelta(days=days - 1)
+    steps: list[tuple[str, Callable]] = [
+        ("backfill_days (new)", lambda: app.backfill_days(start, end + ONE_DAY, jobs=1)),
+        ("backfill_days (existing)", lambda: app.backfill_days(start, end + ONE_DAY, jobs=1)),
+        ("pto_range (set)", lambda: app.pto_range(start, end)),
+        ("pto_range (unset)", lambda: app.pto_range(start, end, False)),
+    ]
+    reset_db()
+    counts = {}
+    for name, func in steps:
+        with count_queries() as statements:
+            func()
+        counts[name] = len(statements)
+    return counts
+
+
+@click.command()
+@click.option("--days", default="30,365", help="comma separated day spans to compare")
+@click.option("--lines-per-day", default=50, show_default=True)
+def main(days: str, lines_per_day: int):
+    logging.basicConfig(level=logging.ERROR)
+    spans = [int(d) for d in days.split(",")]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app.db.connect(Path(tmp_dir) / "bench.db")
+        app.db.create_db()
+        app.config.log_dir = Path(tmp_dir) / "logs"
+        app.config.log_glob = None
+        results = {
+            span: run_counts(app.config.log_dir, span, span * lines_per_day) for span in spans
+        }
+
+    names = list(results[spans[0]])
+    print("\t".join([f"{'step': <24}"] + [f"{span: >6}d" for span in spans]))
+    failed = False
+    for name in names:
+        counts = [results[span][name] for span in spans]
+        print("\t".join([f"{name: <24}"] + [f"{count: >7}" for count in counts]))
+        failed = failed or len(set(counts)) > 1
+    if failed:
+        print("query counts grow with the date range", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compares the sqlite_preset settings on write-heavy backfills / edits and read-heavy reports.
+
+each preset runs in a fresh interpreter with its own database, since app.db can only connect once.
+
+usage (from the repo root): python -m benchmarks.bench_sqlite --days 365 -o sqlite.json
+"""
+
+import datetime as DT
+import io
+import json
+import logging
+import multiprocessing
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Optional
+
+import click
+
+from timesheet.constants import ONE_DAY, SQLITE_PRESETS
+
+from .generate_logs import write_auth_logs
+
+
+def timed(func: Callable) -> float:
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        func()
+    return round(time.perf_counter() - start, 6)
+
+
+def run_preset(preset: str, days: int, lines_per_day: int, edits: int) -> dict[str, float]:
+    from timesheet import app
+    from timesheet.enums import LogType, PrintFormat
+
+    logging.basicConfig(level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app.config.sqlite_preset = preset
+        app.config.log_dir = Path(tmp_dir) / "logs"
+        app.db.connect(Path(tmp_dir) / "bench.db", pragmas=app.config.db_pragmas())
+        app.db.create_db()
+        write_auth_logs(app.config.log_dir, days * lines_per_day, days)
+
+        until_day = DT.date.today() + ONE_DAY
+        from_day = until_day - DT.timedelta(days=days)
+        workdays = list(app.workdate_range(from_day, until_day))[:edits]
+
+        def edit_days():
+            # one commit per edit, like running `timesheet edit` repeatedly
+            for day in workdays:
+                app.edit_log(day, LogType.OUT, DT.time(17, day.day % 60))
+
+        results = {
+            "backfill_days": timed(lambda: app.backfill_days(jobs=1)),
+            f"edit_log x{len(workdays)}": timed(edit_days),
+            "set_flex_balance": timed(
+                lambda: app.set_flex_balance(from_day, DT.timedelta(0), force=True)
+            ),
+            "get_flex_balance (cold)": timed(lambda: app.get_flex_balance(until_day)),
+            "get_flex_balance (warm)": timed(lambda: app.get_flex_balance(until_day)),
+            "print_range": timed(lambda: app.print_range(from_day, until_day, PrintFormat.print)),
+            "hourly_from_range": timed(lambda: app.hourly_from_range(from_day, until_day)),
+        }
+        app.db.disconnect()
+        app.db.engine.dispose()
+    return results
+
+
+@click.command()
+@click.option(
+    "--presets",
+    default=",".join(SQLITE_PRESETS),
+    show_default=True,
+    help="comma separated presets to compare",
+)
+@click.option("-d", "--days", default=365, show_default=True)
+@click.option("--lines-per-day", default=200, show_default=True)
+@click.option("--edits", default=100, show_default=True, help="days to edit one at a time")
+@click.option("-o", "--output", type=click.Path(dir_okay=False, path_type=Path))
+def main(presets: str, days: int, lines_per_day: int, edits: int, output: Optional[Path]):
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for preset in presets.split(","):
+        with ctx.Pool(1) as pool:
+            results[preset] = pool.apply(run_preset, (preset, days, lines_per_day, edits))
+
+    names = list(results[next(iter(results))])
+    print("\t".join([f"{'step (s)': <24}"] + [f"{preset: >8}" for preset in results]))
+    for name in names:
+        print(
+            "\t".join([f"{name: <24}"] + [f"{results[preset][name]: >8.3f}" for preset in results])
+        )
+
+    if output:
+        report = {
+            "params": {"days": days, "lines_per_day": lines_per_day, "edits": edits},
+            "presets": {preset: SQLITE_PRESETS[preset] for preset in results},
+            "results": results,
+        }
+        output.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
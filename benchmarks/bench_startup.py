@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Measures cli startup: the time to import timesheet.cli, and wall time of a few commands, each in a
+fresh interpreter, both run in-process and forwarded to `timesheet serve`. `clock` runs from shell
+hooks on every login, so exits non-zero if importing the cli takes longer than --budget ms or loads
+any of the heavy modules that should only be imported once a command runs.
+
+usage (from the repo root): python -m benchmarks.bench_startup --runs 10 --budget 50
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import click
+
+# modules only needed once a command actually runs
+LAZY_MODULES = [
+    "concurrent.futures.process",
+    "importlib.metadata",
+    "pkg_resources",
+    "sqlalchemy",
+    "timesheet.app",
+    "timesheet.models",
+]
+CLOCK = "import sys; from timesheet import clock_main; sys.argv[0] = 'clock'; clock_main()"
+TIMESHEET = "from timesheet import main; main()"
+REPO_DIR = Path(__file__).parent.parent
+
+
+def python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, cwd=REPO_DIR)
+
+
+def import_time_ms(module: str) -> float:
+    """returns the time taken to import module in a fresh interpreter"""
+    proc = python(
+        "-c",
+        f"import time; start = time.perf_counter(); import {module}; "
+        "print(time.perf_counter() - start)",
+    )
+    return float(proc.stdout) * 1000
+
+
+def slowest_imports(module: str, count: int = 10) -> list[tuple[str, float]]:
+    """returns the modules with the most cumulative import time under module, from -X importtime"""
+    proc = python("-X", "importtime", "-c", f"import {module}")
+    times = []
+    for line in proc.stderr.splitlines()[1:]:
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        times.append((name.strip(), int(cumulative) / 1000))
+    return sorted(times, key=lambda t: t[1], reverse=True)[:count]
+
+
+def loaded_modules(code: str) -> list[str]:
+    """returns the LAZY_MODULES loaded by running code, which may exit"""
+    proc = python(
+        "-c",
+        f"import sys\ntry:\n    {code}\n"
+        "finally:\n    print('\\n'.join(sys.modules), file=sys.stderr)",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{code} failed: {proc.stderr[-500:]}")
+    return sorted(set(LAZY_MODULES) & set(proc.stderr.split()))
+
+
+def wall_time_ms(code: str, *args: str) -> float:
+    start = time.perf_counter()
+    proc = python("-c", code, *args)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed: {proc.stderr[-500:]}")
+    return elapsed
+
+
+@click.command()
+@click.option("-n", "--runs", default=10, show_default=True, help="runs of each, median is used")
+@click.option("--budget", default=50.0, show_default=True, help="max ms to import timesheet.cli")
+@click.option("-o", "--output", type=click.Path(dir_okay=False, path_type=Path))
+def main(runs: int, budget: float, output: Optional[Path]):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = str(Path(tmp_dir) / "bench.db")
+        # keep away from any server already running
+        socket_file = Path(tmp_dir) / "timesheet.sock"
+        os.environ["TIMESHEET_SOCKET"] = str(socket_file)
+        commands = {
+            "python -c pass": ("pass",),
+            "timesheet --version": (TIMESHEET, "--version"),
+            "timesheet --help": (TIMESHEET, "--help"),
+            "clock --help": (CLOCK, "--help"),
+            "clock in": (CLOCK, "in", "-f", "-d", db_file),
+            "print today": (TIMESHEET, "-d", db_file, "print", "today"),
+        }
+        results = {
+            "import timesheet.cli": statistics.median(
+                import_time_ms("timesheet.cli") for _ in range(runs)
+            ),
+        }
+        for name, args in commands.items():
+            results[name] = statistics.median(wall_time_ms(*args) for _ in range(runs))
+
+        server = subprocess.Popen(
+            [sys.executable, "-c", TIMESHEET, "-d", db_file, "serve"],
+            cwd=REPO_DIR,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            for _ in range(100):
+                if socket_file.exists() or server.poll() is not None:
+                    break
+                time.sleep(0.1)
+            else:
+                raise RuntimeError("timesheet serve didn't start")
+            for name in ["clock in", "print today"]:
+                results[f"{name} (serve)"] = statistics.median(
+                    wall_time_ms(*commands[name]) for _ in range(runs)
+                )
+        finally:
+            server.terminate()
+            _, server_err = server.communicate()
+        if server.returncode not in (0, -15):
+            raise RuntimeError(f"timesheet serve failed: {server_err[-500:]}")
+
+    for name, ms in results.items():
+        print(f"{name: <24}\t{ms: >8.1f}ms")
+
+    failed = False
+    eager = loaded_modules("import timesheet.cli")
+    if eager:
+        print(f"importing timesheet.cli loads: {', '.join(eager)}", file=sys.stderr)
+        failed = True
+    if results["import timesheet.cli"] > budget:
+        print(
+            f"importing timesheet.cli takes longer than {budget}ms, from -X importtime:",
+            file=sys.stderr,
+        )
+        for name, ms in slowest_imports("timesheet.cli"):
+            print(f"  {name: <32}\t{ms: >8.1f}ms", file=sys.stderr)
+        failed = True
+
+    if output:
+        report = {
+            "params": {"runs": runs, "budget_ms": budget},
+            "eager_modules": eager,
+            "results_ms": {name: round(ms, 3) for name, ms in results.items()},
+        }
+        output.write_text(json.dumps(report, indent=2) + "\n")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
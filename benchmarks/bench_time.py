@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the time arithmetic used for hours worked / flex balances: the old strptime
+based time_difference against the integer seconds versions. exits non-zero if any of them disagree.
+
+usage (from the repo root): python -m benchmarks.bench_time --pairs 10000
+"""
+
+import datetime as DT
+import random
+import sys
+import timeit
+from typing import Optional
+
+import click
+
+from timesheet.util import (
+    round_time,
+    seconds_difference,
+    seconds_differences,
+    time_difference,
+    time_seconds,
+)
+
+
+def strptime_difference(
+    t1: DT.time,
+    t2: DT.time,
+    rounded: bool = False,
+    round_threshold: Optional[int] = None,
+    round_interval: int = 15,
+) -> DT.timedelta:
+    """time_difference before switching to integer seconds"""
+    if rounded:
+        t1 = strptime_round(t1, round_threshold, round_interval)
+        t2 = strptime_round(t2, round_threshold, round_interval)
+    return abs(
+        DT.datetime.strptime(str(t1), "%H:%M:%S") - DT.datetime.strptime(str(t2), "%H:%M:%S")
+    )
+
+
+def strptime_round(
+    time_obj: DT.time, thresh: Optional[int] = None, to_nearest: int = 15
+) -> DT.time:
+    """round_time before switching to integer seconds"""
+    if thresh is None:
+        thresh = to_nearest // 2
+    mod = time_obj.minute % to_nearest
+    if mod == 0:
+        return time_obj
+    if mod <= thresh:
+        rounded_time = DT.timedelta(minutes=-mod)
+    else:
+        rounded_time = DT.timedelta(minutes=to_nearest - mod)
+    return (DT.datetime.combine(DT.date.today(), time_obj) + rounded_time).time()
+
+
+def random_times(num: int, rng: random.Random) -> list[DT.time]:
+    """any time of day, to check edge cases like rounding past midnight"""
+    return [DT.time(rng.randrange(24), rng.randrange(60), rng.randrange(60)) for _ in range(num)]
+
+
+def work_times(num: int, rng: random.Random) -> list[DT.time]:
+    """
+    times like those in the timesheet table: during the work day, mostly whole minutes from
+    `clock`, with some guessed from the logs to the second
+    """
+    return [
+        DT.time(
+            rng.randrange(6, 18), rng.randrange(60), rng.randrange(60) if rng.random() < 0.3 else 0
+        )
+        for _ in range(num)
+    ]
+
+
+@click.command()
+@click.option("-n", "--pairs", default=10000, show_default=True, help="clock in / out pairs")
+@click.option("--repeat", default=5, show_default=True, help="timing runs, best is reported")
+@click.option("--interval", default=15, show_default=True, help="round_interval")
+@click.option("--threshold", type=int, help="round_threshold  [default: interval // 2]")
+@click.option("--seed", default=0, show_default=True)
+def main(pairs: int, repeat: int, interval: int, threshold: Optional[int], seed: int):
+    rng = random.Random(seed)
+    starts, ends = random_times(pairs, rng), random_times(pairs, rng)
+
+    # check every version gives the same answers, rounded or not
+    failed = False
+    for time_obj in starts + ends:
+        for to_nearest, thresh in [(5, None), (7, 2), (15, None), (15, 0), (15, 15), (30, None)]:
+            if round_time(time_obj, thresh, to_nearest) != strptime_round(
+                time_obj, thresh, to_nearest
+            ):
+                print(f"round_time({time_obj}, {thresh}, {to_nearest}) differs", file=sys.stderr)
+                failed = True
+    for rounded in (False, True):
+        expected = [
+            strptime_difference(t1, t2, rounded, threshold, interval)
+            for t1, t2 in zip(starts, ends)
+        ]
+        results = {
+            "time_difference": [
+                time_difference(t1, t2, rounded, threshold, interval)
+                for t1, t2 in zip(starts, ends)
+            ],
+            "seconds_differences": [
+                DT.timedelta(seconds=secs)
+                for secs in seconds_differences(
+                    [time_seconds(t) for t in starts],
+                    [time_seconds(t) for t in ends],
+                    rounded,
+                    threshold,
+                    interval,
+                )
+            ],
+        }
+        for name, result in results.items():
+            if result != expected:
+                print(f"{name} (rounded={rounded}) differs from strptime", file=sys.stderr)
+                failed = True
+
+    starts, ends = work_times(pairs, rng), work_times(pairs, rng)
+    start_secs, end_secs = [time_seconds(t) for t in starts], [time_seconds(t) for t in ends]
+    benchmarks = {
+        "strptime_difference": lambda: [
+            strptime_difference(t1, t2, True, threshold, interval) for t1, t2 in zip(starts, ends)
+        ],
+        "time_difference": lambda: [
+            time_difference(t1, t2, True, threshold, interval) for t1, t2 in zip(starts, ends)
+        ],
+        "seconds_difference": lambda: [
+            seconds_difference(s1, s2, True, threshold, interval)
+            for s1, s2 in zip(start_secs, end_secs)
+        ],
+        "seconds_differences": lambda: seconds_differences(
+            start_secs, end_secs, True, threshold, interval
+        ),
+    }
+    print(f"{'rounded differences': <24}\t{'total (ms)': >10}\t{'per pair (us)': >13}")
+    for name, func in benchmarks.items():
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        print(f"{name: <24}\t{best * 1000: >10.2f}\t{best / pairs * 1e6: >13.3f}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Generates realistic rotated auth logs for benchmarking.
+
+usage (from the repo root):
+    python -m benchmarks.generate_logs /tmp/authlogs --lines 1000000 --days 60 --files 5
+"""
+
+import datetime as DT
+import gzip
+import random
+from pathlib import Path
+from typing import Iterator, Optional
+
+import click
+
+from timesheet.constants import LOGIN_STRS, LOGOUT_STRS
+
+# syslog has no year, so logs can't span more than a year without dates being misread
+MAX_DAYS = 365
+NOISE = [
+    "sshd[{pid}]: pam_unix(sshd:session): session closed for user deploy",
+    "sshd[{pid}]: Accepted publickey for deploy from 10.0.0.{pid_mod} port 52{pid_mod} ssh2",
+    "sudo[{pid}]:     user : TTY=pts/1 ; PWD=/home/user ; USER=root ; COMMAND=/usr/bin/apt update",
+    "sudo[{pid}]: pam_unix(sudo:session): session opened for user root(uid=0) by user(uid=1000)",
+    "CRON[{pid}]: pam_unix(cron:session): session opened for user root by (uid=0)",
+    "CRON[{pid}]: pam_unix(cron:session): session closed for user root",
+    "polkitd(authority=local): Registered Authentication Agent for unix-session:2",
+    "dbus-daemon[{pid}]: [system] Successfully activated service 'org.freedesktop.nm_dispatcher'",
+]
+LOGIN_MSG = "systemd-logind[{pid}]: {msg}"
+
+
+def log_lines(
+    num_lines: int, days: int, events_per_day: int, end: DT.date, seed: int = 0
+) -> Iterator[str]:
+    """
+    yields num_lines syslog lines spread evenly over `days` days ending on `end`
+
+    each day gets a login in the morning, a logout in the evening and events_per_day - 2 more
+    logins/logouts in between, the rest is noise from other services
+    """
+    rng = random.Random(seed)
+    days = min(days, MAX_DAYS)
+    start = end - DT.timedelta(days=days - 1)
+    per_day = max(num_lines // days, events_per_day, 1)
+    remainder = num_lines - per_day * days if num_lines > per_day * days else 0
+    written = 0
+    for day_idx in range(days):
+        day_lines = per_day + (1 if day_idx < remainder else 0)
+        day_lines = min(day_lines, num_lines - written)
+        if day_lines <= 0:
+            break
+        # spread lines from 06:00 to 22:00
+        step = 16 * 3600 / day_lines
+        day_start = DT.datetime.combine(start + DT.timedelta(days=day_idx), DT.time(6))
+        event_idx = set(rng.sample(range(day_lines), min(events_per_day, day_lines)))
+        first_event, last_event = (min(event_idx), max(event_idx)) if event_idx else (-1, -1)
+        for line_idx in range(day_lines):
+            ts = day_start + DT.timedelta(seconds=int(line_idx * step))
+            pid = rng.randrange(300, 65000)
+            if line_idx == first_event:
+                msg = LOGIN_MSG.format(pid=pid, msg=f"{LOGIN_STRS[0]}.")
+            elif line_idx == last_event:
+                msg = LOGIN_MSG.format(pid=pid, msg=f"{LOGOUT_STRS[0]}.")
+            elif line_idx in event_idx:
+                msg = LOGIN_MSG.format(pid=pid, msg=rng.choice(LOGIN_STRS + LOGOUT_STRS))
+            else:
+                msg = rng.choice(NOISE).format(pid=pid, pid_mod=pid % 100)
+            yield f"{ts:%b} {ts.day:>2} {ts:%H:%M:%S} workstation {msg}\n"
+        written += day_lines
+
+
+def write_auth_logs(
+    log_dir: Path,
+    num_lines: int,
+    days: int = 30,
+    events_per_day: int = 6,
+    num_files: int = 5,
+    plain_files: int = 2,
+    end: Optional[DT.date] = None,
+    seed: int = 0,
+) -> list[Path]:
+    """
+    writes num_lines of auth logs to log_dir, rotated into num_files files like logrotate does:
+    auth.log, auth.log.1, auth.log.2.gz, ... with the first plain_files left uncompressed
+
+    returns the files written, oldest first. logs end today unless end is given.
+    """
+    if end is None:
+        end = DT.date.today()
+    log_dir.mkdir(parents=True, exist_ok=True)
+    for old_log in log_dir.glob("auth.log*"):
+        old_log.unlink()
+
+    names = []
+    for idx in range(num_files):
+        name = "auth.log" if idx == 0 else f"auth.log.{idx}"
+        if idx >= plain_files:
+            name += ".gz"
+        names.append(name)
+    # oldest logs have the highest numbers
+    names.reverse()
+
+    lines_per_file = -(-num_lines // num_files)
+    lines = log_lines(num_lines, days, events_per_day, end, seed)
+    written = []
+    for name in names:
+        logfile = log_dir / name
+        open_func = gzip.open if name.endswith(".gz") else open
+        with open_func(logfile, "wt") as fh:  # type: ignore
+            for _, line in zip(range(lines_per_file), lines):
+                fh.write(line)
+        written.append(logfile)
+    return written
+
+
+@click.command()
+@click.argument("log_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("-n", "--lines", "num_lines", default=100000, show_default=True)
+@click.option("-d", "--days", default=30, show_default=True, help=f"max: {MAX_DAYS}")
+@click.option("-e", "--events-per-day", default=6, show_default=True)
+@click.option("-f", "--files", "num_files", default=5, show_default=True)
+@click.option("-p", "--plain-files", default=2, show_default=True, help="uncompressed files")
+@click.option("--seed", default=0, show_default=True)
+def main(
+    log_dir: Path,
+    num_lines: int,
+    days: int,
+    events_per_day: int,
+    num_files: int,
+    plain_files: int,
+    seed: int,
+):
+    for logfile in write_auth_logs(
+        log_dir, num_lines, days, events_per_day, num_files, plain_files, seed=seed
+    ):
+        print(f"{logfile}\t{logfile.stat().st_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
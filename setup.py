@@ -19,6 +19,7 @@ setup(
             "ipython>=7.19.0",
             "pdbpp>=0.10.2",
             "pylint>=2.6.0",
+            "pytest>=7.0",
             "sqlalchemy-stubs>=0.3",
         ],
         "full": [
@@ -30,7 +31,7 @@ setup(
     packages=["timesheet"],
     entry_points={
         "console_scripts": [
-            "clock = timesheet.cli:clock",
+            "clock = timesheet:clock_main",
             "timesheet = timesheet:main",
         ]
     },
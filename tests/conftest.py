@@ -0,0 +1,28 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from timesheet import app
+from timesheet.models import Activity, FlexDaily, Holiday, LogIndex, LogWatermark, Timesheet
+
+
+@pytest.fixture(scope="session")
+def db_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # app.db can only ever connect to one file, so every test shares it
+    db_file = tmp_path_factory.mktemp("db") / "timesheet.db"
+    app.db.connect(db_file)
+    return db_file
+
+
+@pytest.fixture
+def db(db_file: Path, tmp_path: Path) -> Iterator[Path]:
+    """an empty database, with logs read from tmp_path / "logs" """
+    app.config.log_dir = tmp_path / "logs"
+    app.config.log_glob = None
+    yield db_file
+    app.db.session.rollback()
+    for model in (Timesheet, Holiday, FlexDaily, Activity, LogWatermark, LogIndex):
+        app.db.session.query(model).delete()
+    app.db.try_commit()
+    app.holiday_dates.cache_clear()
@@ -0,0 +1,83 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from timesheet import client
+
+
+@pytest.fixture
+def sock_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    sock_file = tmp_path / "timesheet.sock"
+    monkeypatch.setenv(client.SOCKET_ENV, str(sock_file))
+    return sock_file
+
+
+def serve_once(sock_file: Path, mode: int) -> threading.Thread:
+    """answers a single command on sock_file, like `timesheet serve` would"""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(sock_file))
+    sock_file.chmod(mode)
+    server.listen(1)
+
+    def answer():
+        with server, server.accept()[0] as conn, conn.makefile("rwb") as fh:
+            request = json.loads(fh.readline())
+            response = {"stdout": " ".join(request["args"]), "stderr": "", "exit_code": 3}
+            fh.write(json.dumps(response).encode() + b"\n")
+
+    thread = threading.Thread(target=answer, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_forward(sock_file: Path, capsys: pytest.CaptureFixture):
+    thread = serve_once(sock_file, 0o600)
+    assert client.forward("clock", ["in"]) == 3
+    thread.join(5)
+    assert capsys.readouterr().out == "in"
+
+
+def test_forward_no_server(sock_file: Path):
+    assert client.forward("clock", ["in"]) is None
+
+
+def test_forward_shared_socket(sock_file: Path, capsys: pytest.CaptureFixture):
+    # e.g., created by someone else in /tmp
+    serve_once(sock_file, 0o666)
+    assert client.forward("clock", ["in"]) is None
+    assert "Not using" in capsys.readouterr().err
+
+
+@pytest.fixture
+def custom_db_server(sock_file: Path, tmp_path: Path) -> Iterator[Path]:
+    """a real `timesheet serve`, started with -d on a db that isn't the default one"""
+    db_file = tmp_path / "custom.db"
+    env = dict(os.environ, HOME=str(tmp_path))
+    env.pop(client.CONFIG_ENV, None)
+    cmd = [sys.executable, "-c", "from timesheet import main; main()", "-d", str(db_file), "serve"]
+    server = subprocess.Popen(cmd, env=env, stderr=subprocess.PIPE)
+    for _ in range(100):
+        if sock_file.exists():
+            break
+        time.sleep(0.05)
+    yield db_file
+    server.terminate()
+    server.wait(5)
+
+
+def test_forward_default_db(custom_db_server: Path):
+    # expects ~/timesheet.db, so it mustn't be run against the server's -d
+    assert client.forward("timesheet", ["print", "today"]) is None
+
+
+def test_forward_same_db(custom_db_server: Path, capsys: pytest.CaptureFixture):
+    assert client.forward("timesheet", ["-d", str(custom_db_server), "print", "today"]) == 1
+    assert "No data found" in capsys.readouterr().err
@@ -0,0 +1,55 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from timesheet.config import Config
+from timesheet.sources import JournalSource
+
+SETTINGS = {
+    "log_source": "journal",
+    "log_dir": "/srv/logs",
+    "log_glob": "*.journal",
+    "login_strs": ["Unlocked"],
+    "logout_strs": ["Locked"],
+    "sqlite_preset": "wal",
+    "round_interval": 30,
+}
+
+
+def check_settings(config: Config):
+    source = config.activity_source()
+    assert isinstance(source, JournalSource)
+    assert (source.log_dir, source.log_glob) == (Path("/srv/logs"), "*.journal")
+    matcher = config.activity_matcher()
+    assert (matcher.login_strs, matcher.logout_strs) == (("Unlocked",), ("Locked",))
+    assert config.db_pragmas()["journal_mode"] == "WAL"
+    assert config.round_threshold == 15
+
+
+def test_json_config(tmp_path: Path):
+    config_file = tmp_path / "timesheet.json"
+    config_file.write_text(json.dumps(SETTINGS))
+    check_settings(Config(config_file))
+
+
+@pytest.mark.parametrize("suffix", [".yaml", ".yml"])
+def test_yaml_config(tmp_path: Path, suffix: str):
+    yaml = pytest.importorskip("yaml")
+    config_file = tmp_path / f"timesheet{suffix}"
+    config_file.write_text(yaml.safe_dump(SETTINGS))
+    check_settings(Config(config_file))
+
+
+def test_toml_config(tmp_path: Path):
+    toml = pytest.importorskip("toml")
+    config_file = tmp_path / "timesheet.toml"
+    config_file.write_text(toml.dumps(SETTINGS))
+    check_settings(Config(config_file))
+
+
+def test_unknown_config_format(tmp_path: Path):
+    config_file = tmp_path / "timesheet.ini"
+    config_file.write_text("")
+    with pytest.raises(ValueError):
+        Config(config_file)
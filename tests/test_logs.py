@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import pytest
+
+from timesheet.util import TAIL_BLOCK_SIZE, read_log_bounds
+
+FIRST = "Oct  1 08:00:00 host systemd-logind[1]: Lid opened\n"
+LAST = "Oct  2 17:00:00 host systemd-logind[1]: Lid closed\n"
+
+
+@pytest.mark.parametrize("padding", [0, TAIL_BLOCK_SIZE * 2])
+def test_bounds_skip_unfinished_line(tmp_path: Path, padding: int):
+    logfile = tmp_path / "auth.log"
+    # a last line that's still being written, possibly longer than a block
+    logfile.write_text(FIRST + LAST + "Oct  2 17:00:01 host sshd[2]: " + "x" * padding)
+    assert read_log_bounds(logfile) == (FIRST, LAST.rstrip("\n"))
+
+
+def test_bounds_only_unfinished_line(tmp_path: Path):
+    logfile = tmp_path / "auth.log"
+    logfile.write_text(FIRST.rstrip("\n"))
+    assert read_log_bounds(logfile) is None
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.bench_queries import run_counts
+
+# most statements each step may take, however many days it covers
+MAX_QUERIES = {
+    "backfill_days (new)": 12,
+    "backfill_days (existing)": 4,
+    "pto_range (set)": 3,
+    "pto_range (unset)": 3,
+}
+
+
+@pytest.mark.parametrize("days", [30, 365])
+def test_query_counts(db: Path, tmp_path: Path, days: int):
+    counts = run_counts(tmp_path / "logs", days, days * 50)
+    for name, max_queries in MAX_QUERIES.items():
+        assert counts[name] <= max_queries, f"{name} ran {counts[name]} statements over {days} days"
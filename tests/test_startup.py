@@ -0,0 +1,17 @@
+import pytest
+
+from benchmarks.bench_startup import loaded_modules
+
+# timing is left to benchmarks.bench_startup, it's too noisy to fail tests on. loading any of
+# LAZY_MODULES is what makes startup slow, and that doesn't depend on the machine
+
+
+@pytest.mark.parametrize("module", ["timesheet", "timesheet.cli", "timesheet.client"])
+def test_import_is_lazy(module: str):
+    assert loaded_modules(f"import {module}") == []
+
+
+@pytest.mark.parametrize("args", [["print", "--help"], ["balance", "set", "--help"]])
+def test_subcommand_help_is_lazy(args: list[str]):
+    code = f"from timesheet.cli import run_cli; run_cli({args!r})"
+    assert loaded_modules(code) == []
@@ -1,6 +1,35 @@
-from .cli import run_cli
-from .version import __version__
+import sys
+
+
+def __getattr__(name: str) -> str:
+    # looking up the installed version is slow, so only done when asked for
+    if name == "__version__":
+        from .version import __version__
+
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
+    # `timesheet serve` runs the command if it's up, otherwise load the cli here
+    from .client import forward
+
+    exit_code = forward("timesheet", sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from .cli import run_cli
+
     run_cli(obj={})
+
+
+def clock_main():
+    from .client import forward
+
+    exit_code = forward("clock", sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from .cli import clock
+
+    clock()
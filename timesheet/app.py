@@ -1,29 +1,66 @@
 import datetime as DT
-import gzip
 import logging
-from functools import wraps
+import os
+import time
+from functools import lru_cache, wraps
 from io import TextIOWrapper
+from itertools import chain, repeat
 from pathlib import Path
-from typing import Callable, Optional
-
+from typing import BinaryIO, Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    Integer,
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.expression import ColumnElement, Select, Update
 
 from .config import Config
-from .constants import ONE_DAY, ROW_HEADER, TOMORROW
+from .constants import DAY_SECONDS, DEFAULT_PROJECT, ONE_DAY, ROW_HEADER, TOMORROW
 from .db import DB
 from .enums import LogType, PrintFormat
 from .exceptions import ExistingData, NoData
-from .models import FlexBalance, Holiday, Timesheet
-from .util import AuthLog, Log, clean_time, date_range, log_date, round_time, time_difference
-
-# log parsing
-LOGIN_STRS = (
-    "Lid opened",
-    "Operation 'sleep' finished",
-    "unlocked login keyring",
-    "gnome-keyring-daemon started properly and unlocked keyring",
+from .flex import FlexLedger
+from .models import (
+    Activity,
+    FlexBalance,
+    FlexDaily,
+    Holiday,
+    LogIndex,
+    LogWatermark,
+    Timesheet,
+    TimesheetRow,
 )
-LOGOUT_STRS = ("Lid closed", "System is powering down")
+from .util import (
+    AuthLog,
+    DayActivity,
+    Log,
+    date_range,
+    head_hash,
+    ics_event_dates,
+    iter_ics_events,
+    log_date,
+    log_file_id,
+    reduce_activity,
+    round_time,
+    seconds_differences,
+    time_seconds,
+    unescape_ics,
+)
+
+# timesheet rows fetched at a time when streaming reports
+ROW_BATCH_SIZE = 1000
 
 # exported objects
 db: DB = DB()
@@ -48,50 +85,30 @@ def ensure_db(db: DB) -> Callable:
 def print_range(
     from_day: Optional[DT.date], until_day: Optional[DT.date], print_format: PrintFormat
 ):
-    logs_by_day = {l.date: l for l in get_range(from_day, until_day)}
-    if len(logs_by_day) == 0:
-        if from_day and until_day:
-            raise NoData(
-                db.db_file,
-                "timesheet.date",
-                f"No data found between {from_day} and {until_day}",
-            )
-        elif from_day:
-            raise NoData(
-                db.db_file, "timesheet.date", f"No data found between {from_day} and {TOMORROW}"
-            )
-        elif until_day:
-            raise NoData(db.db_file, "timesheet.date", f"No data found before {TOMORROW}")
-        else:
-            raise NoData(db.db_file, "timesheet.date", f"No log entries found, table is empty")
-
-    if from_day is None:
-        from_day = sorted(logs_by_day.keys())[0]
-    if until_day is None or until_day > TOMORROW:
-        until_day = TOMORROW
-    logging.debug(f"printing data from {from_day} until {until_day}")
-
     if print_format is PrintFormat.print:
         default_time = "None"
+        days = report_days(from_day, until_day)
         print(ROW_HEADER)
-        for curr_day in date_range(from_day, until_day):
-            if curr_day in logs_by_day:
-                print(logs_by_day[curr_day])
+        for curr_day, day_rows in days:
+            if day_rows:
+                print(day_rows[-1])
             elif not is_workday(curr_day):
                 print(curr_day)
             else:
                 print(f"{curr_day}\t{default_time : <8}\t{default_time : <8}")
     else:
         for log_type in LogType:
+            days = report_days(from_day, until_day)
             print(f"{log_type.value.upper()}")
             print("=" * 10)
-            for curr_day in date_range(from_day, until_day):
-                if curr_day in logs_by_day:
-                    day_log = logs_by_day[curr_day].log(log_type)
+            for curr_day, day_rows in days:
+                if day_rows:
+                    day_log = day_rows[-1].log(log_type)
                     if isinstance(day_log.time, DT.time):
                         rounded = round_time(
                             day_log.time,
                             config.round_threshold,
+                            config.round_interval,
                         )
                         print(f"{rounded.hour:02}\t{rounded.minute:02}")
                     elif day_log.time is None:
@@ -105,60 +122,18 @@ def print_range(
 
 @ensure_db(db)
 def hourly_from_range(from_day: Optional[DT.date], until_day: Optional[DT.date]):
-    range_logs = get_range(from_day, until_day)
-    if len(range_logs) == 0:
-        if from_day and until_day:
-            raise NoData(
-                db.db_file,
-                "timesheet.date",
-                f"No data found between {from_day} and {until_day}",
-            )
-        elif from_day:
-            raise NoData(
-                db.db_file, "timesheet.date", f"No data found between {from_day} and {TOMORROW}"
-            )
-        elif until_day:
-            raise NoData(db.db_file, "timesheet.date", f"No data found before {TOMORROW}")
-        else:
-            raise NoData(db.db_file, "timesheet.date", f"No log entries found, table is empty")
-
-    if from_day is None:
-        from_day = range_logs[0].date
-    if until_day is None or until_day > TOMORROW:
-        until_day = TOMORROW
-    logging.debug(f"printing data from {from_day} until {until_day}")
-
-    hours_by_day: dict[DT.date, float] = {}
-    for idx, row in enumerate(range_logs):
-        row_hours = (
-            time_difference(
-                row.clock_in or config.standard_start,
-                row.clock_out or config.standard_quit,
-                True,
-                config.round_threshold,
-            ).total_seconds()
-            / 3600
-        )
-        if row_hours < 0:
-            logging.warning(
-                f"Negative hours on {row.date}: {row.clock_in} - {row.clock_out} ({row_hours:.2f}h)"
-            )
-            row_hours = 0
-        elif row.is_pto:
-            row_hours = 0
-
-        if hours_by_day.get(row.date) is None:
-            hours_by_day[row.date] = 0
-
-        hours_by_day[row.date] += row_hours
+    days = db.session.execute(daily_seconds(from_day, until_day)).all()
+    if all(seconds is None for _, seconds, _ in days):
+        raise no_data(from_day, until_day)
 
+    day_length = config.day_length.total_seconds()
     total = 0
     print("Date\tHours")
-    for curr_day in date_range(from_day, until_day):
-        if is_holiday(curr_day) and curr_day not in hours_by_day:
+    for curr_day, seconds, holiday in days:
+        if holiday and seconds is None:
             continue
 
-        day_hrs = hours_by_day.get(curr_day, config.day_length.total_seconds() / 3600)
+        day_hrs = (day_length if seconds is None else seconds) / 3600
         total += day_hrs
         if day_hrs == 0:
             continue
@@ -166,6 +141,71 @@ def hourly_from_range(from_day: Optional[DT.date], until_day: Optional[DT.date])
     print(f"\t{total:.02f}")
 
 
+def daily_seconds(from_day: Optional[DT.date], until_day: Optional[DT.date]) -> Select:
+    """
+    selects each day in [from_day, until_day) with the seconds worked on it over all projects (NULL
+    if it has no entries), and whether it's a holiday or weekend. defaults to the first entry until
+    today. times are rounded and summed in sql, so a report is a single query.
+    """
+    if until_day is None or until_day > TOMORROW:
+        until_day = TOMORROW
+    until = literal(until_day, Date)
+    in_range = Timesheet.date < until
+    if from_day:
+        start = literal(from_day, Date)
+        in_range &= Timesheet.date >= start
+    else:
+        start = select(func.min(Timesheet.date)).where(in_range).scalar_subquery()
+    dates = select(start.label("date")).where(start < until).cte("dates", recursive=True)
+    next_day = func.date(dates.c.date, "+1 day")
+    dates = dates.union_all(select(next_day).where(next_day < until))
+
+    # missing times count as the standard start / quit, pto as nothing
+    clock_in = func.coalesce(sql_seconds(Timesheet.clock_in), time_seconds(config.standard_start))
+    clock_out = func.coalesce(sql_seconds(Timesheet.clock_out), time_seconds(config.standard_quit))
+    row_seconds = case(
+        (Timesheet.is_pto, 0),
+        else_=func.abs(sql_round_seconds(clock_in) - sql_round_seconds(clock_out)),
+    )
+    worked = (
+        select(Timesheet.date, func.sum(row_seconds).label("seconds"))
+        .where(in_range)
+        .group_by(Timesheet.date)
+        .subquery()
+    )
+    # sqlite's %w is the day of the week from sunday = 0
+    holiday = or_(func.strftime("%w", dates.c.date).in_(["0", "6"]), Holiday.date.is_not(None))
+    return (
+        select(dates.c.date, worked.c.seconds, holiday.label("holiday"))
+        .select_from(
+            dates.outerjoin(worked, worked.c.date == dates.c.date).outerjoin(
+                Holiday, Holiday.date == dates.c.date
+            )
+        )
+        .order_by(dates.c.date)
+    )
+
+
+def sql_seconds(time_col: ColumnElement) -> ColumnElement:
+    """time_seconds in sql"""
+    # time() drops fractional seconds, strftime('%s') on its own would round them
+    return cast(func.strftime("%s", func.time(time_col)), Integer) - cast(
+        func.strftime("%s", "00:00"), Integer
+    )
+
+
+def sql_round_seconds(seconds: ColumnElement) -> ColumnElement:
+    """round_seconds in sql, with the configured round_interval / round_threshold"""
+    interval, threshold = config.round_interval, config.round_threshold
+    mod = seconds / 60 % 60 % interval
+    return case(
+        (mod == 0, seconds),
+        (mod <= threshold, seconds - mod * 60),
+        # wraps around at midnight, same as a DT.time
+        else_=(seconds + (interval - mod) * 60) % DAY_SECONDS,
+    )
+
+
 @ensure_db(db)
 def add_log(
     log_day: DT.date,
@@ -208,30 +248,19 @@ def guess_day(
     # check for an existing entry
     day_log = get_day(day)
 
-    logins: list[DT.time] = list()
-    logouts: list[DT.time] = list()
-    logfiles = get_logs()
+    # only read the logs that can contain the day
+    logfiles = [a.file for a in index_logs() if a.min_date <= day <= a.max_date]
     logging.debug(f"Found {len(logfiles)} log files: {', '.join([s.name for s in logfiles])}")
-    for logfile in logfiles:
-        logging.info(f"checking {logfile} for activity")
-        log_activity = get_activity(logfile, day, clock_in, clock_out)
-        if len(log_activity) == 0:
-            continue
+    sync_activity(logfiles)
 
-        if len(log_activity[day][LogType.IN]):
-            logins.extend(log_activity[day][LogType.IN])
+    day_activity = query_day_activity(day, day + ONE_DAY).get(day, DayActivity())
+    in_time = day_activity.first_in if clock_in else None
+    out_time = day_activity.last_out if clock_out else None
 
-        if len(log_activity[day][LogType.OUT]):
-            logouts.extend(log_activity[day][LogType.OUT])
-
-    if len(logouts) == 0 and len(logins) == 0:
+    if in_time is None and out_time is None:
         logging.error(f"Unable to find any activity on {day}")
         exit(1)
 
-    # have to do this extra explicitly so typing works
-    in_time: Optional[DT.time] = logins[0] if logins else None
-    out_time: Optional[DT.time] = logouts[-1] if logouts else None
-
     if in_time and day_log and day_log.clock_in and not overwrite:
         raise ExistingData((day_log, "clock_in"), in_time)
 
@@ -255,11 +284,13 @@ def backfill_days(
     validate: bool = False,
     overwrite: bool = False,
     holidays: bool = False,
+    jobs: Optional[int] = None,
 ) -> Optional[list[Timesheet]]:
     """
     Backfill entries on weekdays in the given range based on auth.log activity.
 
-    Replacing existing data requires validate=True or overwrite=True
+    Replacing existing data requires validate=True or overwrite=True. Log files are scanned in
+    parallel by up to `jobs` processes, defaulting to the number of cores.
     """
     idx = index_logs()
     logging.debug(f"got indexed logs {idx}")
@@ -276,36 +307,30 @@ def backfill_days(
         until_day = TOMORROW
     logging.info(f"Backfilling from {from_day} until {until_day}")
 
-    all_activity: dict[DT.date, dict[LogType, list[DT.time]]] = dict()
-    for authlog in idx:
-        # target range: [from_day, until_day)
-        # log dates: [min_date, max_date]
-        logging.debug(f"Checking {authlog.file} for activity")
-        if (from_day <= authlog.min_date < until_day) or (
-            from_day <= authlog.max_date <= until_day
-        ):
-            log_activity = get_activity(authlog.file, log_in=True, log_out=True)
-            for log_day in log_activity:
-                # skip any days outside of range and weekends/holidays
-                if log_day < from_day or log_day >= until_day or is_holiday(log_day):
-                    continue
-                if log_day in all_activity:
-                    logging.debug(f"extending new activity for {log_day}")
-                    for lt in LogType:
-                        all_activity[log_day][lt].extend(log_activity[log_day][lt])
-                else:
-                    logging.debug(f"adding new activity for {log_day}")
-                    all_activity[log_day] = log_activity[log_day]
+    # target range: [from_day, until_day)
+    # log dates: [min_date, max_date]
+    logfiles = [
+        authlog.file
+        for authlog in idx
+        if (from_day <= authlog.min_date < until_day) or (from_day <= authlog.max_date <= until_day)
+    ]
+    sync_activity(logfiles, jobs)
+    all_activity = {
+        log_day: day_activity
+        for log_day, day_activity in query_day_activity(from_day, until_day).items()
+        # skip weekends/holidays
+        if not is_holiday(log_day)
+    }
 
-    new_days: list[Timesheet] = []
-    AuditRow = tuple[Timesheet, tuple[Optional[DT.time], Optional[DT.time]]]
-    audit_list: list[AuditRow] = list()
+    existing = {row.date: row for row in get_range(from_day, until_day)}
+    new_rows: list[dict] = []
+    updates: list[dict] = []
     for a_day in date_range(from_day, until_day):
         if is_holiday(a_day) and not holidays:
             logging.info(f"Found activity on {a_day}, but it's not a work day. Skipping.")
             continue
         logging.debug(f"checking for activity from {a_day}")
-        curr_row = get_day(a_day)
+        curr_row = existing.get(a_day)
         if use_standard and is_workday(a_day):
             clock_in = config.standard_start
             clock_out = config.standard_quit
@@ -315,13 +340,10 @@ def backfill_days(
 
         if a_day in all_activity:
             logging.debug(f"found activity on {a_day}")
-            # get earliest login
-            if all_activity[a_day][LogType.IN]:
-                clock_in = sorted(all_activity[a_day][LogType.IN])[0]
-
-            # get last logout
-            if all_activity[a_day][LogType.OUT]:
-                clock_out = sorted(all_activity[a_day][LogType.OUT])[-1]
+            if all_activity[a_day].first_in:
+                clock_in = all_activity[a_day].first_in
+            if all_activity[a_day].last_out:
+                clock_out = all_activity[a_day].last_out
         elif not use_standard:
             # not in log activity, not using standard, nothing to do here
             continue
@@ -332,78 +354,92 @@ def backfill_days(
                 clock_in if clock_in and clock_in != curr_row.clock_in else None,
                 clock_out if clock_out and clock_out != curr_row.clock_out else None,
             )
-            if any(new_times):
-                audit_list.append((curr_row, new_times))
+            if not any(new_times):
+                continue
+            merged_times = merge_times(curr_row, new_times, validate, overwrite)
+            if merged_times:
+                updates.append(
+                    {
+                        "day": a_day,
+                        "day_project": curr_row.project,
+                        "new_in": merged_times[0],
+                        "new_out": merged_times[1],
+                        "force": validate or overwrite,
+                    }
+                )
         else:
-            new_row = Timesheet(date=a_day, clock_in=clock_in, clock_out=clock_out)
-            logging.debug(f"creating new record {new_row}")
+            logging.debug(f"creating new record on {a_day}: {clock_in} - {clock_out}")
             if not validate or get_resp(
-                f"Create new entry on {new_row.date}: clock in {new_row.clock_in}, clock out {new_row.clock_out}"
+                f"Create new entry on {a_day}: clock in {clock_in}, clock out {clock_out}"
             ):
-                new_days.append(new_row)
-
-    for log_obj, updates in audit_list:
-        new_obj = merge_times(log_obj, updates, validate, overwrite)
-        if new_obj:
-            new_days.append(new_obj)
+                new_rows.append(
+                    {
+                        "date": a_day,
+                        "clock_in": clock_in,
+                        "clock_out": clock_out,
+                        "project": DEFAULT_PROJECT,
+                    }
+                )
 
-    if len(new_days) == 0:
+    if not new_rows and not updates:
         return
-    db.session.add_all(new_days)
+    # core statements keep multi-year backfills to one executemany each, and can update rows with
+    # a NULL clock_in, which the ORM can't since it's part of the primary key.
+    # INSERT .. ON CONFLICT won't work here: conflicts need a matching clock_in, which is usually
+    # what's being changed, and NULL clock_ins never conflict.
+    if new_rows:
+        db.session.execute(insert(Timesheet), new_rows)
+    if updates:
+        db.session.execute(backfill_update(), updates)
+    changed_days = {row["date"] for row in new_rows} | {row["day"] for row in updates}
+    invalidate_flex(min(changed_days))
     db.try_commit()
-    return sorted(new_days, key=lambda x: x.date)
+    return sorted(
+        [row for row in get_range(from_day, until_day) if row.date in changed_days],
+        key=lambda x: x.date,
+    )
 
 
 @ensure_db(db)
 def import_calendar(cal: TextIOWrapper):
     """Parse an ics file and load into db"""
-    in_event = False
-    curr_event = dict()
-    all_events: dict[DT.date, Holiday] = {}
-    for line in cal:
-        if not in_event and line.strip() == "BEGIN:VEVENT":
-            in_event = True
-        elif in_event and ":" in line:
-            key, val = line.strip().split(":", 1)
-            if key == "SUMMARY":
-                curr_event["name"] = val
-            elif key.startswith("DTSTART"):
-                curr_event["date"] = DT.datetime.strptime(val, "%Y%m%d").date()
-            elif key == "END":
-                if "date" not in curr_event or "name" not in curr_event:
-                    print(f"missing required field(s): {curr_event}")
-                    breakpoint()
-                existing = (
-                    db.session.query(Holiday).filter(Holiday.date == curr_event["date"]).all()
+    new_holidays: dict[DT.date, str] = {}
+    for event in iter_ics_events(cal):
+        if "DTSTART" not in event or "SUMMARY" not in event:
+            logging.warning(f"skipping event missing required field(s): {event}")
+            continue
+        name = unescape_ics(event["SUMMARY"])
+        for hday in ics_event_dates(event):
+            existing_name = new_holidays.get(hday)
+            if existing_name == name:
+                logging.info(f"skipping duplicate entry for '{name}'")
+            elif existing_name:
+                logging.info(
+                    f"cannot create '{name}' on {hday}, '{existing_name}' already in queue, skipping"
                 )
-                if existing:
-                    logging.info(
-                        "cannot create {name} on {date}, {existing_name} already there, skipping".format(
-                            existing_name=existing[0].name,
-                            **curr_event,
-                        )
-                    )
-                    continue
-                elif existing := all_events.get(curr_event["date"]):
-                    if existing.name == curr_event["name"]:
-                        logging.info("skipping duplicate entry for '{name}'".format(**curr_event))
-                    else:
-                        logging.info(
-                            "cannot create '{name}' on {date}, '{existing_name}' already in queue, skipping".format(
-                                existing_name=existing.name,
-                                **curr_event,
-                            )
-                        )
-                    continue
-                logging.debug("Creating holiday '{name}' on {date}".format(**curr_event))
-                hday = Holiday(**curr_event)
-                all_events[hday.date] = hday
-                curr_event = dict()
-                in_event = False
-    db.session.add_all(all_events.values())
-    db.try_commit(True)
-    logging.info(f"Added {len(all_events)} new holidays to table")
-    pass
+            else:
+                logging.debug(f"Creating holiday '{name}' on {hday}")
+                new_holidays[hday] = name
+
+    if new_holidays:
+        existing = db.session.query(Holiday.date, Holiday.name).filter(
+            Holiday.date >= min(new_holidays), Holiday.date <= max(new_holidays)
+        )
+        for hday, existing_name in existing:
+            if hday in new_holidays:
+                name = new_holidays.pop(hday)
+                logging.info(
+                    f"cannot create {name} on {hday}, {existing_name} already there, skipping"
+                )
+
+    if new_holidays:
+        db.session.execute(
+            insert(Holiday), [{"date": hday, "name": name} for hday, name in new_holidays.items()]
+        )
+        invalidate_flex(min(new_holidays))
+        db.try_commit()
+        holiday_dates.cache_clear()
+    logging.info(f"Added {len(new_holidays)} new holidays to table")
 
 
 @ensure_db(db)
@@ -419,6 +455,7 @@ def flex_date(dt: DT.date, flex_val: bool = True) -> Timesheet:
         day = Timesheet(date=dt)
     day.is_flex = flex_val  # type: ignore
     db.session.add(day)
+    invalidate_flex(dt)
     db.try_commit(True)
     logging.info(f"Marked {dt} is_flex={flex_val}")
     return day
@@ -426,62 +463,67 @@ def flex_date(dt: DT.date, flex_val: bool = True) -> Timesheet:
 
 @ensure_db(db)
 def get_flex_balance(dt: DT.date) -> tuple[FlexBalance, list[DT.date]]:
-    """returns flex balance for the given day and list of days missing entries (if any)"""
-    missing_logs = []
+    """
+    returns flex balance at the start of the given day, counting from the latest balance set on or
+    before it, and list of days missing entries (if any)
+    """
     latest: Optional[FlexBalance] = (
-        db.session.query(FlexBalance).order_by(FlexBalance.date.desc()).first()
+        db.session.query(FlexBalance)
+        .filter(FlexBalance.date <= dt)
+        .order_by(FlexBalance.date.desc())
+        .first()
     )
     if latest is None:
         raise NoData(
             db.db_file, "flexbalance", "No flex balance data, cannot fetch current balance"
         )
     elif latest.date == dt:
-        return latest, missing_logs
-
-    logs = get_range(latest.date, dt)
-    balance = DT.timedelta(seconds=latest.seconds)
-    for day in workdate_range(latest.date, dt):
-        work_len = DT.timedelta(0)
-        if logs and logs[0].date == day:
-            day_log = logs.pop(0)
-            if day_log.is_flex:
-                # assume flexed holiday/weekend is a mistake, but show a warning
-                if not is_workday(day) and not config.work_weekend:
-                    logging.warning(
-                        f"Check timesheet on {day}: marked as flex, but is a weekend or holiday"
-                    )
-                    continue
-            elif day_log.is_pto:
-                continue
-            elif day_log.clock_in and day_log.clock_out:
-                work_len = time_difference(
-                    day_log.clock_in, day_log.clock_out, True, config.round_threshold
-                )
-        elif not is_workday(day):
-            # no log, not a workday
-            continue
-        else:
-            # it's a work day, but no timesheet entry found. ignored by balance calcs.
-            # should be explicitly flexed or have logs added
-            logging.info(f"{day} missing timesheet data, skipping")
-            missing_logs.append(day)
-            continue
+        return latest, []
 
-        if is_workday(day):
-            need_len = config.day_length
-        else:
-            need_len = DT.timedelta(0)
+    update_flex_daily(dt)
+    in_range = (FlexDaily.date >= latest.date, FlexDaily.date < dt)
+    last_day: Optional[FlexDaily] = (
+        db.session.query(FlexDaily).filter(*in_range).order_by(FlexDaily.date.desc()).first()
+    )
+    missing_logs = [
+        day for (day,) in db.session.query(FlexDaily.date).filter(*in_range, FlexDaily.missing)
+    ]
+    db.try_commit()
 
-        net = work_len - need_len
-        logging.debug(f"{day}: work_len={work_len} need_len={need_len} net={net}")
-        logging.debug(f"old balance: {balance} new balance: {balance + net}")
-        balance += net
     if missing_logs:
         logging.warning(
             f"Found {len(missing_logs)} days with missing data: {', '.join([str(d) for d in missing_logs])}"
         )
         logging.warning(f"FlexBalance may be inaccurate")
-    return FlexBalance.from_timedelta(dt, balance), missing_logs
+    balance = last_day.balance if last_day else latest.seconds
+    return FlexBalance(date=dt, seconds=balance), missing_logs
+
+
+@ensure_db(db)
+def get_flex_ledger(until_day: DT.date) -> FlexLedger:
+    """returns a FlexLedger of every day from the first flex balance set until until_day"""
+    anchors: dict[DT.date, int] = dict(
+        db.session.query(FlexBalance.date, FlexBalance.seconds).filter(
+            FlexBalance.date <= until_day
+        )
+    )
+    if not anchors:
+        raise NoData(
+            db.db_file, "flexbalance", "No flex balance data, cannot fetch current balance"
+        )
+
+    update_flex_daily(until_day)
+    db.try_commit()
+    start = min(anchors)
+    nets = [0] * max((until_day - start).days, 0)
+    missing = set()
+    for day, net, is_missing in db.session.query(
+        FlexDaily.date, FlexDaily.net, FlexDaily.missing
+    ).filter(FlexDaily.date >= start, FlexDaily.date < until_day):
+        nets[(day - start).days] = net
+        if is_missing:
+            missing.add(day)
+    return FlexLedger(start, nets, anchors, missing)
 
 
 @ensure_db(db)
@@ -504,16 +546,18 @@ def set_flex_balance(
         bal = FlexBalance(date=dt, seconds=bal_dt.seconds)
 
     db.session.add(bal)
+    invalidate_flex(dt)
     db.try_commit(True)
     return bal
 
 
 @ensure_db(db)
 def pto_range(start_dt: DT.date, end_dt: DT.date, pto_val: bool = True) -> list[Timesheet]:
+    existing = {row.date: row for row in get_range(start_dt, end_dt + ONE_DAY)}
     days = []
     for dt in date_range(start_dt, end_dt + ONE_DAY):
         if is_workday(dt):
-            day = get_day(dt)
+            day = existing.get(dt)
             if day:
                 if pto_val == day.is_pto:
                     logging.info(f"{dt} already has is_pto={pto_val}")
@@ -531,6 +575,7 @@ def pto_range(start_dt: DT.date, end_dt: DT.date, pto_val: bool = True) -> list[
 
     if days:
         db.session.add_all(days)
+        invalidate_flex(days[0].date)
         db.try_commit()
     return days
 
@@ -538,57 +583,157 @@ def pto_range(start_dt: DT.date, end_dt: DT.date, pto_val: bool = True) -> list[
 ### internal stuff
 
 
+def update_flex_daily(until_day: DT.date):
+    """fills in the flexdaily table for every work day before until_day"""
+    flex_key = config.flex_key()
+    if db.session.query(FlexDaily.date).filter(FlexDaily.config_key != flex_key).first():
+        logging.info("flex settings changed, recalculating daily balances")
+        db.session.execute(delete(FlexDaily))
+
+    anchors: dict[DT.date, int] = dict(
+        db.session.query(FlexBalance.date, FlexBalance.seconds).filter(FlexBalance.date < until_day)
+    )
+    if not anchors:
+        return
+    last_day: Optional[FlexDaily] = (
+        db.session.query(FlexDaily).order_by(FlexDaily.date.desc()).first()
+    )
+    if last_day:
+        from_day = last_day.date + ONE_DAY
+        balance = last_day.balance
+    else:
+        from_day = min(anchors)
+        balance = anchors[from_day]
+    if from_day >= until_day:
+        return
+
+    logging.debug(f"calculating daily flex balances from {from_day} until {until_day}")
+    work_days = [
+        (day, day_rows[-1] if day_rows else None)
+        for day, day_rows in group_days(iter_range(from_day, until_day), from_day, until_day)
+        if is_workday(day)
+    ]
+    nets = dict(zip([day for day, _ in work_days], flex_nets(work_days)))
+    new_rows = []
+    for day in date_range(from_day, until_day):
+        balance = anchors.get(day, balance)
+        if day not in nets:
+            continue
+        net, missing = nets[day]
+        balance += net
+        new_rows.append(
+            {
+                "date": day,
+                "net": net,
+                "balance": balance,
+                "missing": missing,
+                "config_key": flex_key,
+            }
+        )
+    if new_rows:
+        db.session.execute(insert(FlexDaily), new_rows)
+
+
+def flex_nets(day_logs: Sequence[tuple[DT.date, Optional[TimesheetRow]]]) -> list[tuple[int, bool]]:
+    """
+    returns the seconds of flex gained on each work day, and whether it's missing an entry. work
+    lengths are calculated for all the days at once.
+    """
+    worked = [day_log for _, day_log in day_logs if day_log and has_work_times(day_log)]
+    work_lens = iter(
+        seconds_differences(
+            [time_seconds(day_log.clock_in) for day_log in worked],  # type: ignore
+            [time_seconds(day_log.clock_out) for day_log in worked],  # type: ignore
+            True,
+            config.round_threshold,
+            config.round_interval,
+        )
+    )
+    day_length = int(config.day_length.total_seconds())
+    nets = []
+    for day, day_log in day_logs:
+        if day_log is None:
+            # it's a work day, but no timesheet entry found. ignored by balance calcs.
+            # should be explicitly flexed or have logs added
+            logging.info(f"{day} missing timesheet data, skipping")
+            nets.append((0, True))
+            continue
+        elif day_log.is_pto:
+            nets.append((0, False))
+            continue
+
+        work_len = next(work_lens) if has_work_times(day_log) else 0
+        net = work_len - day_length
+        logging.debug(f"{day}: work_len={work_len}s need_len={day_length}s net={net}s")
+        nets.append((net, False))
+    return nets
+
+
+def has_work_times(day_log: TimesheetRow) -> bool:
+    """whether a timesheet entry counts towards time worked"""
+    return (
+        not day_log.is_pto and not day_log.is_flex and bool(day_log.clock_in and day_log.clock_out)
+    )
+
+
+def invalidate_flex(day: DT.date):
+    """drops daily flex balances from day onward, they're recalculated when next needed"""
+    db.session.execute(delete(FlexDaily).where(FlexDaily.date >= day))
+
+
 def merge_times(
     current: Timesheet,
     new_times: tuple[Optional[DT.time], Optional[DT.time]],
     validate: bool = False,
     overwrite: bool = False,
-) -> Optional[Timesheet]:
-    if new_times:
-        if validate:
-            ci_str = f"in {current.clock_in}"
-            if new_times[0]:
-                ci_str += f" -> {new_times[0]}"
-            co_str = f"out {current.clock_out}"
-            if new_times[1]:
-                co_str += f" -> {new_times[1]}"
-            msg_str = f"Update existing data on {current.date}: {ci_str}, {co_str}"
-            if not get_resp(msg_str):
-                logging.info(f"Skipping {current.date}")
-                return
-        else:
-            # skip any existing values unless overwrite enabled
-            skip = []
-            if new_times[0] and current.clock_in and not overwrite:
-                skip.append(LogType.IN)
-            if new_times[1] and current.clock_out and not overwrite:
-                skip.append(LogType.OUT)
-
-            if len(skip) == 2:
-                # "new" times match or won't overwrite existing values
-                return
-            elif len(skip) == 1:
-                # remove the one that got skipped
-                new_times = (
-                    new_times[0] if LogType.IN not in skip else None,
-                    new_times[1] if LogType.OUT not in skip else None,
-                )
-            # else leave new_times as is: two new values to update (unlikely unless overwrite)
-    else:
-        if validate and not get_resp(
-            f"Create new entry on {current.date}: clock in {current.clock_in}, clock out {current.clock_out}"
-        ):
+) -> Optional[tuple[Optional[DT.time], Optional[DT.time]]]:
+    """returns which of new_times should replace the clock in/out of current, None if neither"""
+    if validate:
+        ci_str = f"in {current.clock_in}"
+        if new_times[0]:
+            ci_str += f" -> {new_times[0]}"
+        co_str = f"out {current.clock_out}"
+        if new_times[1]:
+            co_str += f" -> {new_times[1]}"
+        msg_str = f"Update existing data on {current.date}: {ci_str}, {co_str}"
+        if not get_resp(msg_str):
             logging.info(f"Skipping {current.date}")
             return
+    elif not overwrite:
+        # skip any existing values
+        new_times = (
+            new_times[0] if not current.clock_in else None,
+            new_times[1] if not current.clock_out else None,
+        )
 
     if any(new_times):
-        if new_times[0]:
-            current.clock_in = new_times[0]  # type: ignore
-        if new_times[1]:
-            current.clock_out = new_times[1]  # type: ignore
-    else:
-        return
-    return current
+        return new_times
+    # "new" times match or won't overwrite existing values
+    return
+
+
+def backfill_update() -> Update:
+    """
+    returns an UPDATE for executemany with a day, day_project, new_in, new_out and force in each set of
+    parameters. new times only replace existing times if force is set, like merge_times.
+    """
+    timesheet = Timesheet.__table__
+    force = bindparam("force", type_=Boolean)
+    new_times = {}
+    for col_name, param_name in (("clock_in", "new_in"), ("clock_out", "new_out")):
+        col = timesheet.c[col_name]
+        new_time = bindparam(param_name, type_=col.type)
+        new_times[col_name] = case(
+            (force, func.coalesce(new_time, col)), else_=func.coalesce(col, new_time)
+        )
+    return (
+        update(timesheet)
+        .where(
+            timesheet.c.date == bindparam("day", type_=timesheet.c.date.type),
+            timesheet.c.project.is_(bindparam("day_project", type_=timesheet.c.project.type)),
+        )
+        .values(**new_times)
+    )
 
 
 def get_resp(msg: str) -> bool:
@@ -601,79 +746,307 @@ def get_resp(msg: str) -> bool:
     return resp in pos
 
 
-def get_activity(
-    logfile: Path,
-    day: Optional[DT.date] = None,
-    log_in: bool = True,
-    log_out: bool = False,
-) -> dict[DT.date, dict[LogType, list[DT.time]]]:
-    results: dict[DT.date, dict[LogType, list[DT.time]]] = {}
-
-    logging.debug(f"checking {logfile} for day={day} log_in={log_in} log_out={log_out}")
-    open_func = open
-    if logfile.name.endswith(".gz"):
-        open_func = gzip.open
-    with open_func(logfile, "rt") as logs:
-        for log_line in logs:
-            line_dt = log_date(log_line)
-            line_day = line_dt.date()
-            line_time = line_dt.time()
-
-            # if no day passed, get all activity from file
-            if day:
-                # break out of files that won't have the day being looked for
-                # skip lines that aren't on the day we're looking for
-                if line_day > day:
-                    break
-                elif line_day < day:
-                    continue
+def scan_logs(
+    logfiles: list[Path], offsets: list[int], jobs: Optional[int] = None
+) -> Iterator[tuple[int, list[tuple[DT.datetime, LogType]], int]]:
+    """
+    reads the activity in each logfile after its offset from the configured activity source, and
+    yields batches of (index of the logfile, events, offset after the events)
+
+    files are scanned in a pool of up to `jobs` processes, defaulting to the number of cores
+    """
+    source = config.activity_source()
+    # pass the matcher along explicitly, spawned workers won't have the current config
+    match_activity = config.activity_matcher()
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(logfiles))
+    if jobs <= 1:
+        for idx, (logfile, offset) in enumerate(zip(logfiles, offsets)):
+            logging.debug(f"reading activity from {logfile} starting at {offset}")
+            for events, end_offset in source.read(logfile, offset, match_activity):
+                yield idx, events, end_offset
+        return
 
-            if log_in and any([True for login_str in LOGIN_STRS if login_str in log_line]):
-                log_type = LogType.IN
-            elif log_out and any([True for logout_str in LOGOUT_STRS if logout_str in log_line]):
-                log_type = LogType.OUT
+    # only needed for multi-process scans, and slow enough to import that `clock` shouldn't pay for it
+    from concurrent.futures import ProcessPoolExecutor
+
+    logging.debug(f"scanning {len(logfiles)} logs with {jobs} processes")
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = pool.map(source.read_all, logfiles, offsets, repeat(match_activity))
+        for idx, (events, end_offset) in enumerate(results):
+            yield idx, events, end_offset
+
+
+def sync_activity(
+    logfiles: list[Path], jobs: Optional[int] = None
+) -> list[tuple[DT.datetime, LogType]]:
+    """
+    reads any activity added to logfiles since the last sync into the activity table, and returns
+    the new events
+
+    see LogWatermark for how files are tracked across rotations
+    """
+    matcher_key = config.activity_matcher().key
+    watermarks = {row.file_id: row for row in db.session.query(LogWatermark).all()}
+    if any(mark.matcher_key != matcher_key for mark in watermarks.values()):
+        # events already stored may have been matched by strings that were since removed or moved
+        # between login / logout. a row's source is the path it was read from, which goes stale on
+        # rotation, so start over from every current log
+        logging.info("login/logout strings changed since logs were last read, re-reading all logs")
+        db.session.execute(delete(Activity))
+        db.session.execute(delete(LogWatermark))
+        watermarks = {}
+        logfiles = get_logs()
+    to_read: list[LogWatermark] = []
+    offsets: list[int] = []
+    for logfile in logfiles:
+        file_id = log_file_id(logfile)
+        mark = watermarks.pop(file_id, None)
+        offset: Optional[int]
+        if mark is None:
+            mark = LogWatermark(file_id=file_id)
+            offset = 0
+        elif logfile.name.endswith(".gz"):
+            logging.debug(f"{logfile} already read, skipping")
+            offset = None
+        else:
+            size = logfile.stat().st_size
+            # make sure the inode hasn't been reused for a different file
+            if size < mark.offset or mark.head_hash != head_hash(logfile, mark.offset):
+                offset = 0
+            elif size == mark.offset:
+                logging.debug(f"no new activity in {logfile}, skipping")
+                offset = None
             else:
+                offset = mark.offset
+
+        # keep track of where the file has been rotated to
+        mark.path = str(logfile)
+        if offset is not None:
+            to_read.append(mark)
+            offsets.append(offset)
+
+    new_events: list[tuple[DT.datetime, LogType]] = []
+    logfiles = [Path(mark.path) for mark in to_read]
+    for idx, events, offset in scan_logs(logfiles, offsets, jobs):
+        mark = to_read[idx]
+        logging.debug(f"found {len(events)} new events in {mark.path}")
+        record_activity(events, mark.path)
+        new_events.extend(events)
+        mark.offset = offset
+        mark.head_hash = head_hash(Path(mark.path), offset)
+        mark.matcher_key = matcher_key
+        db.session.add(mark)
+
+    # forget about logs that have been rotated out
+    if watermarks:
+        current_ids = {log_file_id(logfile) for logfile in get_logs()}
+        for file_id, stale_mark in watermarks.items():
+            stale_path = Path(stale_mark.path)
+            if file_id in current_ids or (
+                stale_path.exists() and log_file_id(stale_path) == file_id
+            ):
                 continue
+            db.session.delete(stale_mark)
+    db.try_commit()
+    return new_events
 
-            if line_day not in results:
-                results[line_day] = {LogType.IN: [], LogType.OUT: []}
-
-            results[line_day][log_type].append(clean_time(line_time))
 
+def query_day_activity(from_day: DT.date, until_day: DT.date) -> dict[DT.date, DayActivity]:
+    """returns the earliest login and latest logout on each day in [from_day, until_day)"""
+    log_day = func.date(Activity.timestamp)
+    rows = (
+        db.session.query(Activity.type, func.min(Activity.timestamp), func.max(Activity.timestamp))
+        .filter(
+            Activity.timestamp >= DT.datetime.combine(from_day, DT.time()),
+            Activity.timestamp < DT.datetime.combine(until_day, DT.time()),
+        )
+        .group_by(log_day, Activity.type)
+    )
+    results: dict[DT.date, DayActivity] = {}
+    for log_type, first_ts, last_ts in rows:
+        timestamp = first_ts if log_type is LogType.IN else last_ts
+        reduce_activity([(timestamp, log_type)], results)
     return results
 
 
+def record_activity(events: list[tuple[DT.datetime, LogType]], source: str):
+    """adds events to the activity table, ignoring any already there"""
+    if events:
+        db.session.execute(
+            insert(Activity).prefix_with("OR IGNORE"),
+            [{"timestamp": ts, "type": lt, "source": source} for ts, lt in events],
+        )
+
+
+def apply_activity(events: list[tuple[DT.datetime, LogType]]) -> list[DT.date]:
+    """
+    moves clock in earlier / clock out later on each work day to cover the given events, creating
+    new timesheet entries as needed. flexed or PTO days are left alone.
+
+    returns the days that were changed
+    """
+    changed: list[DT.date] = []
+    for day, day_activity in sorted(reduce_activity(events).items()):
+        if is_holiday(day):
+            continue
+        clock_in = day_activity.first_in
+        clock_out = day_activity.last_out
+        # use core statements, the ORM can't update a row with a NULL clock_in primary key
+        day_log = db.session.execute(
+            select(
+                Timesheet.clock_in, Timesheet.clock_out, Timesheet.is_flex, Timesheet.is_pto
+            ).where(Timesheet.date == day)
+        ).first()
+        if day_log is None:
+            db.session.execute(
+                insert(Timesheet).values(
+                    date=day, clock_in=clock_in, clock_out=clock_out, project=config.default_project
+                )
+            )
+        elif day_log.is_flex or day_log.is_pto:
+            continue
+        else:
+            new_times = {}
+            if clock_in and (day_log.clock_in is None or clock_in < day_log.clock_in):
+                new_times["clock_in"] = clock_in
+            if clock_out and (day_log.clock_out is None or clock_out > day_log.clock_out):
+                new_times["clock_out"] = clock_out
+            if not new_times:
+                continue
+            db.session.execute(update(Timesheet).where(Timesheet.date == day).values(**new_times))
+        changed.append(day)
+    if changed:
+        invalidate_flex(changed[0])
+    return changed
+
+
+@ensure_db(db)
+def watch_log(logfile: Path, commit_interval: float = 60, poll_interval: float = 1):
+    """
+    follows logfile like `tail -F`, recording activity and updating today's timesheet entry as
+    logins and logouts happen. changes are committed every commit_interval seconds.
+    """
+    match_activity = config.activity_matcher()
+    fh, mark = open_watched(logfile)
+    events: list[tuple[DT.datetime, LogType]] = []
+    last_commit = time.monotonic()
+    try:
+        while True:
+            raw_line = fh.readline()
+            if raw_line.endswith(b"\n"):
+                mark.offset += len(raw_line)
+                log_line = raw_line.decode(errors="replace")
+                log_type = match_activity(log_line)
+                if log_type is not None:
+                    # don't pass in today, this can run for days
+                    events.append((log_date(log_line), log_type))
+                continue
+
+            # at EOF or a partly written line, wait for more
+            fh.seek(mark.offset)
+            if events and time.monotonic() - last_commit >= commit_interval:
+                commit_watched(fh, mark, events)
+                events = []
+                last_commit = time.monotonic()
+
+            if log_rotated(logfile, fh, mark.offset):
+                logging.info(f"{logfile} was rotated, reopening")
+                commit_watched(fh, mark, events)
+                events = []
+                fh.close()
+                fh, mark = open_watched(logfile)
+            else:
+                time.sleep(poll_interval)
+    finally:
+        commit_watched(fh, mark, events)
+        fh.close()
+
+
+def open_watched(logfile: Path) -> tuple[BinaryIO, LogWatermark]:
+    """opens logfile at the end of the last sync, after catching up on today's activity"""
+    today = DT.date.today()
+    missed = [event for event in sync_activity([logfile]) if event[0].date() == today]
+    if apply_activity(missed):
+        db.try_commit()
+    mark: LogWatermark = (
+        db.session.query(LogWatermark).filter(LogWatermark.file_id == log_file_id(logfile)).one()
+    )
+    fh = logfile.open("rb")
+    fh.seek(mark.offset)
+    logging.info(f"watching {logfile} from offset {mark.offset}")
+    return fh, mark
+
+
+def commit_watched(fh: BinaryIO, mark: LogWatermark, events: list[tuple[DT.datetime, LogType]]):
+    record_activity(events, mark.path)
+    for day in apply_activity(events):
+        logging.info(f"updated timesheet entry on {day}")
+    mark.head_hash = head_hash(fh, mark.offset)
+    db.session.add(mark)
+    db.try_commit()
+
+
+def log_rotated(logfile: Path, fh: BinaryIO, offset: int) -> bool:
+    """checks if logfile has been replaced or truncated since fh was opened"""
+    try:
+        stat = logfile.stat()
+    except FileNotFoundError:
+        # in the middle of being rotated, keep reading the old file
+        return False
+    return stat.st_ino != os.fstat(fh.fileno()).st_ino or stat.st_size < offset
+
+
 def index_logs() -> list[AuthLog]:
-    log_index = list()
-    for logfile in get_logs():
-        open_func = open
-        if logfile.name.endswith(".gz"):
-            open_func = gzip.open
-        first_line = None
-        last_line = None
-        with open_func(logfile, "rt") as logs:
-            for logline in logs:
-                # skip empty lines
-                if not logline.strip():
-                    continue
+    """
+    returns the date range of every log in the activity source, oldest first
 
-                if first_line is None:
-                    first_line = logline
-                last_line = logline
+    date ranges are cached in the logindex table, so only new or changed files are scanned
+    """
+    source = config.activity_source()
+    cached: dict[str, LogIndex] = {row.path: row for row in db.session.query(LogIndex).all()}
+    log_index = list()
+    for logfile in source.files():
+        stat = logfile.stat()
+        row = cached.pop(str(logfile), None)
+        if row and row.matches(stat):
+            logging.debug(f"using cached index for {logfile}")
+            log_index.append(row.authlog)
+            continue
 
-        if first_line is None or last_line is None:
+        logging.debug(f"indexing {logfile}")
+        log_dates = source.bounds(logfile)
+        if log_dates is None:
             logging.error(f"Malformed authlog {logfile}, skipping")
+            if row:
+                db.session.delete(row)
             continue
 
-        min_date = log_date(first_line).date()
-        max_date = log_date(last_line).date()
-        log_index.append(AuthLog(logfile, min_date, max_date))
+        if row is None:
+            row = LogIndex(path=str(logfile))
+        row.update(stat, *log_dates)
+        db.session.add(row)
+        log_index.append(row.authlog)
+
+    # drop any logs that have been rotated out since the last run
+    for stale_row in cached.values():
+        logging.debug(f"removing stale index for {stale_row.path}")
+        db.session.delete(stale_row)
+    db.try_commit()
+
     # start from the oldest logs (auth.log.4.gz)
     return sorted(log_index, key=lambda x: x.min_date)
 
 
+@lru_cache(maxsize=None)
+def holiday_dates() -> frozenset[DT.date]:
+    """every date in the holidays table, loaded once per process and cleared by import_calendar"""
+    return frozenset(hday for (hday,) in db.session.query(Holiday.date))
+
+
 def is_holiday(day: DT.date) -> bool:
-    return day.weekday() > 4 or db.session.query(Holiday).filter(Holiday.date == day).count() > 0
+    return day.weekday() > 4 or day in holiday_dates()
 
 
 def is_workday(day: DT.date) -> bool:
@@ -695,8 +1068,8 @@ def get_day(day: DT.date, missing_okay: bool = True) -> Optional[Timesheet]:
     return day_log
 
 
-def get_logs(log_dir: Path = Path("/var/log")):
-    return list(log_dir.glob("auth.log*"))
+def get_logs() -> list[Path]:
+    return config.activity_source().files()
 
 
 def get_range(
@@ -718,6 +1091,74 @@ def get_range(
     return logs
 
 
+def iter_range(
+    from_day: Optional[DT.date] = None,
+    until_day: Optional[DT.date] = None,
+    batch_size: int = ROW_BATCH_SIZE,
+) -> Iterator[TimesheetRow]:
+    """streams timesheet entries in [from_day, until_day) by date, fetching batch_size at a time"""
+    query = select(*TimesheetRow.columns()).order_by(Timesheet.date)
+    if from_day:
+        query = query.where(Timesheet.date >= from_day)
+    if until_day:
+        query = query.where(Timesheet.date < until_day)
+    for batch in db.session.execute(query).partitions(batch_size):
+        for row in batch:
+            yield TimesheetRow._make(row)
+
+
+def group_days(
+    rows: Iterator[TimesheetRow], from_day: DT.date, until_day: DT.date
+) -> Iterator[tuple[DT.date, list[TimesheetRow]]]:
+    """yields each day in [from_day, until_day) with its entries from rows, which are by date"""
+    next_row = next(rows, None)
+    for curr_day in date_range(from_day, until_day):
+        day_rows = []
+        while next_row and next_row.date <= curr_day:
+            if next_row.date == curr_day:
+                day_rows.append(next_row)
+            next_row = next(rows, None)
+        yield curr_day, day_rows
+
+
+def report_days(
+    from_day: Optional[DT.date], until_day: Optional[DT.date]
+) -> Iterator[tuple[DT.date, list[TimesheetRow]]]:
+    """
+    returns an iterator of each day in a report with its entries. defaults to the first entry
+    until today, and raises NoData if there are no entries in the range.
+    """
+    rows = iter_range(from_day, until_day)
+    first_row = next(rows, None)
+    if first_row is None:
+        raise no_data(from_day, until_day)
+
+    if from_day is None:
+        from_day = first_row.date
+    if until_day is None or until_day > TOMORROW:
+        until_day = TOMORROW
+    logging.debug(f"printing data from {from_day} until {until_day}")
+    return group_days(chain([first_row], rows), from_day, until_day)
+
+
+def no_data(from_day: Optional[DT.date], until_day: Optional[DT.date]) -> NoData:
+    """returns the error for a report with no entries in the range"""
+    if from_day and until_day:
+        return NoData(
+            db.db_file,
+            "timesheet.date",
+            f"No data found between {from_day} and {until_day}",
+        )
+    elif from_day:
+        return NoData(
+            db.db_file, "timesheet.date", f"No data found between {from_day} and {TOMORROW}"
+        )
+    elif until_day:
+        return NoData(db.db_file, "timesheet.date", f"No data found before {TOMORROW}")
+    else:
+        return NoData(db.db_file, "timesheet.date", f"No log entries found, table is empty")
+
+
 def row_exists(idx: DT.date) -> bool:
     return bool(get_day(idx))
 
@@ -741,6 +1182,7 @@ def add_row(
         project=project,
     )
     db.session.add(new_row)
+    invalidate_flex(day)
     try:
         db.session.commit()
     except IntegrityError as e:
@@ -785,11 +1227,13 @@ def update_row(
         exit(1)
 
     db.session.add(row)
+    invalidate_flex(day)
     try:
         db.try_commit()
     except Exception as e:
         logging.error(f"Unable to update row: {e}")
-        breakpoint()
+        if db.interactive:
+            breakpoint()
         raise e
 
     return row
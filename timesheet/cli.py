@@ -1,31 +1,36 @@
 import datetime as DT
 import logging
+import signal
 from io import TextIOWrapper
 from pathlib import Path
 from typing import Optional
 
 import click
 
-from .app import add_log, backfill_days
-from .app import config as app_config
-from .app import (
-    db,
-    edit_log,
-    flex_date,
-    get_flex_balance,
-    guess_day,
-    hourly_from_range,
-    import_calendar,
-    print_range,
-    pto_range,
-    set_flex_balance,
+from .constants import (
+    DATE_FORMATS,
+    DATETIME_FORMATS,
+    DEFAULT_PROJECT,
+    ONE_DAY,
+    ROW_HEADER,
+    WEEKDAYS,
 )
-from .constants import DATE_FORMATS, DATETIME_FORMATS, DEFAULT_PROJECT, ONE_DAY, ROW_HEADER, TODAY
 from .enums import AllTargets, AllTargetsType, LogType, PrintFormat
-from .exceptions import ExistingData, NoData
+from .exceptions import ExistingData, NoData, RunLocally
 from .util import dt2date, init_logs, str2enum, target2dt, validate_datetime
 from .version import get_version
 
+# commands import from .app when they run, since it loads sqlalchemy and the models. `clock` runs
+# from shell hooks on every login, so --help / --version and the cli itself should stay light.
+
+# the config and database files used by `timesheet serve`, which the commands it runs must match,
+# and the config's own db file, which is what a command run without -d expects
+served: Optional[tuple[Optional[Path], Path, Path]] = None
+# the config's db file before -d overrides it
+config_db_file: Optional[Path] = None
+# ctx.meta key set when a subcommand was passed --help
+SUBCOMMAND_HELP = "timesheet.subcommand_help"
+
 ##########################################################################################
 #                                   core functionality                                   #
 ##########################################################################################
@@ -35,7 +40,16 @@ from .version import get_version
 #############
 
 
-@click.group(__package__, invoke_without_command=True)
+class TimesheetGroup(click.Group):
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        # the group callback runs before subcommands parse their args, so note if they'll only be
+        # printing help
+        sub_args = super().parse_args(ctx, args)
+        ctx.meta[SUBCOMMAND_HELP] = any(arg in ctx.help_option_names for arg in sub_args)
+        return sub_args
+
+
+@click.group(__package__, cls=TimesheetGroup, invoke_without_command=True)
 @click.option(
     "-d",
     "--db-file",
@@ -64,6 +78,9 @@ def run_cli(
     if print_version:
         print(get_version(True))
         exit()
+    # nothing to set up for shell completion or a subcommand's --help, which exit before running
+    if ctx.resilient_parsing or ctx.meta.get(SUBCOMMAND_HELP):
+        return
     init_app(config_file, db_file, log_level)
 
 
@@ -77,7 +94,7 @@ def run_cli(
 @click.option(
     "-c",
     "--config-file",
-    type=click.Path(dir_okay=False),
+    type=click.Path(dir_okay=False, path_type=Path),
     envvar="TIMESHEET_CONFIG",
     hidden=True,
 )
@@ -85,7 +102,7 @@ def run_cli(
 @click.argument(
     "log_time",
     metavar="[TIME_STRING]",
-    default=str(DT.datetime.now()),
+    default=lambda: str(DT.datetime.now()),
     type=click.DateTime(DATETIME_FORMATS),
     callback=validate_datetime,
 )
@@ -95,7 +112,7 @@ def run_cli(
 @click.option(
     "-d",
     "--db-file",
-    type=click.Path(dir_okay=False, writable=True),
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
     hidden=True,
 )
 def clock(
@@ -107,6 +124,10 @@ def clock(
     config_file: Optional[Path],
     db_file: Optional[Path],
 ):
+    from .app import add_log
+    from .app import config as app_config
+    from .app import guess_day
+
     init_app(config_file, db_file)
 
     try:
@@ -158,18 +179,28 @@ def clock(
     is_flag=True,
     help="Include holidays and weekends when backfilling",
 )
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    help="Number of processes used to scan logs (default: number of cores)",
+)
 def backfill(
     target: AllTargetsType,
     use_standard: bool,
     validate: bool,
     overwrite: bool,
     include_holidays: bool,
+    jobs: Optional[int],
 ):
     f"""
     Backfills timesheet days in the given period from system logs
 
     Valid arguments: {', '.join(AllTargets)}
     """
+    from .app import backfill_days
+    from .app import config as app_config
+
     min_date, max_date = target2dt(target)
     if min_date and not max_date:
         max_date = min_date + ONE_DAY
@@ -182,6 +213,7 @@ def backfill(
         any([validate, app_config.debug]),
         overwrite,
         include_holidays,
+        jobs,
     )
     if new_logs:
         print(f"Created or updated {len(new_logs)} timesheet entries:")
@@ -193,6 +225,85 @@ def backfill(
         exit(1)
 
 
+#####################
+## timesheet watch ##
+#####################
+
+
+@click.command(help="follow the auth log and clock in/out as logins and logouts happen")
+@click.option(
+    "-l",
+    "--log-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Syslog file to follow (default: auth.log in the configured log_dir)",
+)
+@click.option(
+    "-i",
+    "--interval",
+    type=click.FloatRange(min=0),
+    default=60,
+    show_default=True,
+    help="Seconds between commits to the database",
+)
+def watch(log_file: Optional[Path], interval: float):
+    from .app import config as app_config
+    from .app import watch_log
+
+    if log_file is None:
+        log_file = Path(app_config.log_dir) / "auth.log"
+    # exit cleanly on SIGTERM so pending activity is committed
+    signal.signal(signal.SIGTERM, lambda signum, frame: exit(0))
+    try:
+        watch_log(log_file, interval)
+    except KeyboardInterrupt:
+        pass
+
+
+#####################
+## timesheet serve ##
+#####################
+
+
+@click.command(
+    help=(
+        "keep the database open and run the `timesheet` / `clock` commands sent to it, "
+        "so they start faster"
+    )
+)
+@click.option(
+    "-s",
+    "--socket",
+    "socket_file",
+    type=click.Path(dir_okay=False, path_type=Path),
+    envvar="TIMESHEET_SOCKET",
+    help="Socket to listen on (default: $XDG_RUNTIME_DIR/timesheet.sock)",
+)
+@click.pass_context
+def serve(ctx: click.Context, socket_file: Optional[Path]):
+    global served
+    from .app import config as app_config
+    from .client import socket_path
+    from .server import serve_commands
+
+    config_file: Optional[Path] = ctx.parent.params["config_file"] if ctx.parent else None
+    served = (
+        config_file.resolve() if config_file else None,
+        Path(app_config.db_file).resolve(),
+        Path(config_db_file or app_config.db_file).resolve(),
+    )
+    # exit cleanly on SIGTERM so the socket is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: exit(0))
+    try:
+        serve_commands(
+            socket_file or Path(socket_path()), {"timesheet": run_cli, "clock": clock}, served[0]
+        )
+    except RuntimeError as e:
+        logging.error(e)
+        exit(1)
+    except KeyboardInterrupt:
+        pass
+
+
 ####################
 ## timesheet edit ##
 ####################
@@ -203,11 +314,13 @@ def backfill(
 @click.argument(
     "log_time",
     metavar="[TIME_STRING]",
-    default=TODAY,
+    default=lambda: str(DT.date.today()),
     type=click.DateTime(DATETIME_FORMATS),
     callback=validate_datetime,
 )
 def edit(log_type: LogType, log_time: DT.datetime):
+    from .app import edit_log
+
     try:
         new_log = edit_log(log_time.date(), log_type, log_time.time())
     except NoData as e:
@@ -235,6 +348,8 @@ def edit(log_type: LogType, log_time: DT.datetime):
 )
 @click.option("--export", is_flag=True, help=f"print in a form easy to paste into the spreadsheet")
 def print_logs(target: AllTargetsType, export: bool):
+    from .app import print_range
+
     print_format = PrintFormat.export if export else PrintFormat.print
     min_date, max_date = target2dt(target)
     try:
@@ -247,6 +362,8 @@ def print_logs(target: AllTargetsType, export: bool):
 @click.command("export", short_help="export daily/hourly summaries")
 @click.argument("month", metavar="MONTH_NAME", callback=str2enum)
 def export_hourly(month: AllTargetsType):
+    from .app import hourly_from_range
+
     min_date, max_date = target2dt(month)
     try:
         hourly_from_range(min_date, max_date)
@@ -264,6 +381,8 @@ def export_hourly(month: AllTargetsType):
 @click.argument("cal", metavar="calendar.ics", type=click.File())
 def update_holidays(cal: TextIOWrapper):
     """ics file from e.g., https://www.calendarlabs.com/ical-calendar/holidays/norway-holidays-62/"""
+    from .app import import_calendar
+
     import_calendar(cal)
 
 
@@ -280,18 +399,20 @@ def update_holidays(cal: TextIOWrapper):
 @click.command(
     "flex",
     short_help="mark a day as flexed",
-    help=f"mark the given date as flexed (default: {TODAY})",
+    help="mark the given date as flexed (default: today)",
 )
 @click.argument(
     "date",
     metavar="[DATE]",
     type=click.DateTime(DATE_FORMATS),
     callback=dt2date,
-    default=str(TODAY),
+    default=lambda: str(DT.date.today()),
 )
 @click.option("--unflex", "flex_val", flag_value=False, help="unmark a date as flexed")
 @click.option("--flex", "flex_val", flag_value=True, default=True, hidden=True)
 def flex_day(date: DT.date, flex_val: bool):
+    from .app import flex_date
+
     new_day = flex_date(date, flex_val)
     print(f"new day:\n{new_day}")
 
@@ -305,7 +426,7 @@ def flex_day(date: DT.date, flex_val: bool):
     "pto",
     short_help="mark a day as PTO",
     help=(
-        f"marks/unmarks the given date(s) as PTO (default: {TODAY}). If two dates are given, "
+        "marks/unmarks the given date(s) as PTO (default: today). If two dates are given, "
         "all work dates in the inclusive range are modified."
     ),
 )
@@ -314,7 +435,7 @@ def flex_day(date: DT.date, flex_val: bool):
     metavar="[DATE]",
     type=click.DateTime(DATE_FORMATS),
     callback=dt2date,
-    default=str(TODAY),
+    default=lambda: str(DT.date.today()),
 )
 @click.argument(
     "end_date",
@@ -325,6 +446,8 @@ def flex_day(date: DT.date, flex_val: bool):
 )
 @click.option("--pto/--no-pto", default=True, help="mark/unmark a date as PTO")
 def pto_day(date: DT.date, end_date: Optional[DT.date], pto: bool):
+    from .app import pto_range
+
     if end_date is None:
         end_date = date + ONE_DAY
     else:
@@ -355,21 +478,23 @@ def balance():
 ##############################
 
 
-@balance.command("show", help=f"show flex balance for the given date (default: {TODAY})")
+@balance.command("show", help="show flex balance for the given date (default: today)")
 @click.argument(
     "date",
     metavar="[DATE]",
     type=click.DateTime(DATE_FORMATS),
     callback=dt2date,
-    default=str(TODAY),
+    default=lambda: str(DT.date.today()),
 )
 def get_balance(date: DT.date):
+    from .app import get_flex_balance
+
     try:
         current_balance, _ = get_flex_balance(date)
     except NoData as e:
         print(e)
         exit(1)
-    when = "Current" if date == TODAY else str(date)
+    when = "Current" if date == DT.date.today() else str(date)
     print(f"{when} balance: {current_balance.hours}h")
 
 
@@ -385,6 +510,8 @@ def get_balance(date: DT.date):
 @click.argument("balance", type=float, required=True)
 @click.option("--force", is_flag=True, help="overwrite any existing balance on the given day")
 def set_balance(date: DT.date, balance: float, force: bool):
+    from .app import set_flex_balance
+
     balance_dt = DT.timedelta(hours=balance)
     try:
         new_balance = set_flex_balance(date, balance_dt, force)
@@ -402,14 +529,61 @@ def set_balance(date: DT.date, balance: float, force: bool):
 @balance.command("update", help="update flex balance table to the current day")
 @click.option("--force", is_flag=True, help="overwrite any existing balance for today")
 def update_balance(force: bool):
+    from .app import set_flex_balance
+
     try:
-        new_balance = set_flex_balance(TODAY, force=force)
+        new_balance = set_flex_balance(DT.date.today(), force=force)
     except NoData as e:
         print(e)
         exit(1)
     print(f"New flex balance: {new_balance.hours}h")
 
 
+################################
+### timesheet balance series ###
+################################
+
+
+@balance.command(
+    "series", help="show the flex balance at the start of each day from FROM until UNTIL"
+)
+@click.argument(
+    "from_day", metavar="FROM", type=click.DateTime(DATE_FORMATS), callback=dt2date, required=True
+)
+@click.argument(
+    "until_day",
+    metavar="[UNTIL]",
+    type=click.DateTime(DATE_FORMATS),
+    callback=dt2date,
+    default=lambda: str(DT.date.today()),
+)
+@click.option(
+    "-w",
+    "--weekday",
+    "weekdays",
+    type=click.Choice(WEEKDAYS, case_sensitive=False),
+    multiple=True,
+    help="only show the given days of the week, e.g., -w fri",
+)
+def balance_series(from_day: DT.date, until_day: DT.date, weekdays: tuple[str, ...]):
+    from .app import get_flex_ledger
+
+    try:
+        ledger = get_flex_ledger(until_day + ONE_DAY)
+    except NoData as e:
+        print(e)
+        exit(1)
+    show_days = {WEEKDAYS.index(w.lower()) for w in weekdays}
+    print(f"{'Date': <10}\t{'Net': >8}\t{'Balance': >8}")
+    for flex_day in ledger.series(from_day, until_day + ONE_DAY):
+        if show_days and flex_day.date.weekday() not in show_days:
+            continue
+        missing = "\tmissing" if flex_day.missing else ""
+        print(
+            f"{flex_day.date}\t{flex_day.net / 3600: >+7.2f}h\t{flex_day.balance / 3600: >7.2f}h{missing}"
+        )
+
+
 ##########################################################################################
 #                                        internal                                        #
 ##########################################################################################
@@ -421,17 +595,53 @@ def init_app(
     log_level: int = logging.WARNING,
 ):
     """Updates config from cli options"""
+    global config_db_file
+    from .app import config as app_config
+    from .app import db
+
+    if served is not None:
+        # already set up by `timesheet serve`, which can only run commands for its own files
+        served_config, served_db, served_default_db = served
+        if (config_file.resolve() if config_file else None) != served_config:
+            raise RunLocally(f"config file {config_file} is not {served_config}")
+        # without -d, the command expects the config's db file, not the one serve was started with
+        client_db = db_file.expanduser().resolve() if db_file else served_default_db
+        if client_db != served_db:
+            raise RunLocally(f"db file {client_db} is not {served_db}")
+        app_config.debug = log_level == logging.DEBUG
+        init_logs(log_level)
+        return
+
     if config_file:
-        app_config.from_file(config_file)
+        try:
+            app_config.from_file(config_file)
+        except ValueError as e:
+            logging.error(e)
+            exit(1)
+    # a plain string if set in the config file
+    config_db_file = app_config.db_file = Path(app_config.db_file).expanduser()
     if db_file and db_file != app_config.db_file:
         app_config.db_file = db_file
     app_config.debug = log_level == logging.DEBUG
     init_logs(log_level)
-    db.connect(app_config.db_file)
+    try:
+        pragmas = app_config.db_pragmas()
+        # check the rounding settings up front
+        app_config.rounding_table()
+    except ValueError as e:
+        logging.error(e)
+        exit(1)
+    try:
+        db.connect(app_config.db_file, pragmas=pragmas)
+    except RuntimeError as e:
+        logging.error(e)
+        exit(1)
 
 
 run_cli.add_command(clock)
 run_cli.add_command(backfill)
+run_cli.add_command(watch)
+run_cli.add_command(serve)
 run_cli.add_command(export_hourly)
 run_cli.add_command(edit)
 run_cli.add_command(print_logs)
@@ -0,0 +1,70 @@
+import json
+import os
+import socket
+import stat
+import sys
+from typing import Optional
+
+# forwards commands to `timesheet serve` when it's running. only uses the standard library, so
+# `clock in` doesn't pay for importing click or sqlalchemy when the server can run it instead.
+
+SOCKET_ENV = "TIMESHEET_SOCKET"
+CONFIG_ENV = "TIMESHEET_CONFIG"
+# commands and options that need the terminal (or run forever), always run in-process. the server
+# sends back anything else that turns out to prompt for input
+LOCAL_ARGS = {"serve", "watch", "-", "-v", "--validate", "-D", "-vv", "--debug"}
+
+
+def socket_path() -> str:
+    """returns the socket `timesheet serve` listens on by default"""
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    elif os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "timesheet.sock")
+    return os.path.join("/tmp", f"timesheet-{os.getuid()}.sock")
+
+
+def forward(prog: str, args: list[str]) -> Optional[int]:
+    """
+    runs a command in `timesheet serve` and prints its output, returning its exit code. returns
+    None if the command should run in-process instead, e.g., if the server isn't running.
+    """
+    if LOCAL_ARGS.intersection(args):
+        return None
+
+    sock_file = socket_path()
+    try:
+        sock_stat = os.stat(sock_file)
+    except OSError:
+        # no server running
+        return None
+    # anyone can create the default socket in /tmp first, and would get every command sent to it
+    if (
+        not stat.S_ISSOCK(sock_stat.st_mode)
+        or sock_stat.st_uid != os.getuid()
+        or sock_stat.st_mode & 0o077
+    ):
+        print(f"Not using {sock_file}: it must be a socket only accessible by you", file=sys.stderr)
+        return None
+
+    request = {"prog": prog, "args": args, "cwd": os.getcwd(), "config": os.environ.get(CONFIG_ENV)}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(sock_file)
+        except OSError:
+            # left behind by a server that didn't exit cleanly
+            return None
+        try:
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as fh:
+                response = json.loads(fh.readline())
+        except (OSError, ValueError) as e:
+            # the command may have already run, so don't try again in-process
+            print(f"Lost connection to timesheet serve: {e}", file=sys.stderr)
+            return 1
+
+    if response.get("run_locally"):
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
@@ -1,11 +1,12 @@
 import datetime as DT
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Sequence, Union
 
-from .constants import DEFAULT_PROJECT
-from .enums import ConfigFormat
-from .util import time_difference
+from .constants import DEFAULT_PROJECT, LOGIN_STRS, LOGOUT_STRS, SQLITE_PRESETS
+from .enums import ConfigFormat, SourceType
+from .sources import ActivitySource, get_source
+from .util import ActivityMatcher, get_activity_matcher, rounding_table, time_difference
 
 DEF_DBFILE = Path().home() / "timesheet.db"
 
@@ -16,10 +17,20 @@ class Config:
     default_project = DEFAULT_PROJECT
     _day_length: Optional[DT.timedelta] = None
     work_weekend = False
+    # minutes past the hour are rounded to a multiple of round_interval, rounding down if up to
+    # round_threshold minutes past it (default: half the interval)
     round_interval = 15
-    round_threshold = round_interval // 2
+    _round_threshold: Optional[int] = None
     db_file = DEF_DBFILE
+    # one of SQLITE_PRESETS, with any pragmas set in sqlite_pragmas taking precedence
+    sqlite_preset = "default"
+    sqlite_pragmas: Optional[dict[str, Union[str, int]]] = None
     debug = False
+    login_strs: Sequence[str] = LOGIN_STRS
+    logout_strs: Sequence[str] = LOGOUT_STRS
+    log_source = SourceType.syslog
+    log_dir = Path("/var/log")
+    log_glob: Optional[str] = None
 
     def __init__(self, config_file: Optional[Path] = None, **kwargs):
         if config_file:
@@ -34,6 +45,46 @@ class Config:
             self._day_length = time_difference(self.standard_quit, self.standard_start)
         return self._day_length
 
+    @property
+    def round_threshold(self) -> int:
+        if self._round_threshold is None:
+            return self.round_interval // 2
+        return self._round_threshold
+
+    @round_threshold.setter
+    def round_threshold(self, value: int):
+        self._round_threshold = value
+
+    def rounding_table(self) -> tuple[int, ...]:
+        """returns the rounded minute of the day for each minute, see util.rounding_table"""
+        return rounding_table(self.round_interval, self.round_threshold)
+
+    def db_pragmas(self) -> dict[str, Union[str, int]]:
+        """returns the sqlite pragmas to apply on connecting"""
+        if self.sqlite_preset not in SQLITE_PRESETS:
+            raise ValueError(
+                f"Unknown sqlite_preset {self.sqlite_preset!r}. Must be one of: "
+                + ", ".join(SQLITE_PRESETS)
+            )
+        return {**SQLITE_PRESETS[self.sqlite_preset], **(self.sqlite_pragmas or {})}
+
+    def flex_key(self) -> str:
+        """identifies the settings used to calculate flex balances"""
+        return (
+            f"{int(self.day_length.total_seconds())}:{self.round_interval}:{self.round_threshold}"
+        )
+
+    def activity_matcher(self, log_in: bool = True, log_out: bool = True) -> ActivityMatcher:
+        """returns a compiled matcher for the configured login/logout strings"""
+        return get_activity_matcher(
+            tuple(self.login_strs) if log_in else (),
+            tuple(self.logout_strs) if log_out else (),
+        )
+
+    def activity_source(self) -> ActivitySource:
+        """returns the configured source of login/logout activity"""
+        return get_source(SourceType(self.log_source), Path(self.log_dir), self.log_glob)
+
     def from_file(self, config_file: Path, strict: bool = False):
         if not config_file.exists():
             err = OSError(f"Specified config file {config_file} does not exist")
@@ -44,7 +95,7 @@ class Config:
                 return
 
         try:
-            format = ConfigFormat[config_file.suffix]
+            format = ConfigFormat[config_file.suffix.lstrip(".")]
         except KeyError:
             raise ValueError(
                 f"Unrecognized config format {config_file}. Must be one of: "
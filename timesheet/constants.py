@@ -1,12 +1,65 @@
 import datetime as DT
+from typing import Union
 
 DEFAULT_PROJECT = "default"
 
 # dates
 ONE_DAY = DT.timedelta(days=1)
+DAY_SECONDS = int(ONE_DAY.total_seconds())
+DAY_MINUTES = DAY_SECONDS // 60
 TODAY = DT.date.today()
 TOMORROW = TODAY + ONE_DAY
 YESTERDAY = TODAY - ONE_DAY
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# log parsing
+LOGIN_STRS = (
+    "Lid opened",
+    "Operation 'sleep' finished",
+    "unlocked login keyring",
+    "gnome-keyring-daemon started properly and unlocked keyring",
+)
+LOGOUT_STRS = ("Lid closed", "System is powering down")
+
+# sqlite tuning, applied to each connection. see https://www.sqlite.org/pragma.html
+# journal_mode=WAL is saved in the database file itself, so it's only set by presets chosen in the
+# config file, and stays on until journal_mode is set back to DELETE in sqlite_pragmas
+SQLITE_PRESETS: dict[str, dict[str, Union[str, int]]] = {
+    # sqlite's own defaults
+    "none": {},
+    # bigger caches, and waits for a write lock instead of failing. nothing that outlasts the
+    # connection
+    "default": {
+        "cache_size": -16384,
+        "mmap_size": 67108864,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL lets reads (e.g., print) run while watch/backfill write, fsyncs only at checkpoints
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16384,
+        "mmap_size": 67108864,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # fsync on every commit, for databases on flaky storage
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+    # big caches and no fsyncs for one-off imports / backfills of large histories
+    "bulk": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
 
 # formatting
 TIME_FORMATS = ["%H:%M"]
@@ -1,14 +1,23 @@
 import logging
+import re
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Optional, Union
 
-from sqlalchemy import MetaData, create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import MetaData, create_engine, event, inspect
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from .models import Base
+from .models import Activity, Base, FlexDaily, LogIndex, LogWatermark
+
+# stored in PRAGMA user_version. bump when changing the schema, and add a migration from the
+# previous version to MIGRATIONS
+SCHEMA_VERSION = 1
+Pragmas = dict[str, Union[str, int]]
+PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+PRAGMA_VALUE = re.compile(r"^-?\w+$")
 
 
 class DB:
@@ -16,18 +25,37 @@ class DB:
     session: scoped_session
     db_file: Path
     metadata: MetaData = Base.metadata
+    pragmas: Pragmas = {}
+    # unset when there's no terminal to drop into the debugger on, e.g., in `timesheet serve`
+    interactive: bool = True
     _sessionmaker: sessionmaker
 
-    def __init__(self, db_file: Optional[Path] = None, echo_sql=False):
+    def __init__(
+        self, db_file: Optional[Path] = None, echo_sql=False, pragmas: Optional[Pragmas] = None
+    ):
+        if pragmas:
+            self.pragmas = validate_pragmas(pragmas)
         if db_file:
             self.db_file = db_file
             self._init_session(echo_sql)
 
     def _init_session(self, echo_sql: bool):
         db_str = f"sqlite:///{self.db_file}"
-        self.engine = create_engine(db_str, echo=echo_sql)
+        # keep connections open between sessions (sqlalchemy 1.4 reconnects each time by default)
+        # so the pragmas only run once per connection
+        self.engine = create_engine(db_str, echo=echo_sql, poolclass=QueuePool)
+        if self.pragmas:
+            event.listen(self.engine, "connect", self._set_pragmas)
         self._sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.session = scoped_session(self._sessionmaker)
+        self.migrate()
+
+    def _set_pragmas(self, dbapi_conn, connection_record):
+        """applies self.pragmas to each new sqlite connection"""
+        cursor = dbapi_conn.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
 
     def _validate_conn(self):
         conn_attrs = ["session", "engine", "db_file"]
@@ -46,7 +74,12 @@ class DB:
             return Path(make_url(self.engine.url).database)
         return None
 
-    def connect(self, db_file: Optional[Path] = None, echo_sql: bool = False):
+    def connect(
+        self,
+        db_file: Optional[Path] = None,
+        echo_sql: bool = False,
+        pragmas: Optional[Pragmas] = None,
+    ):
         # no db_file, no connection
         if not any([db_file, hasattr(self, "db_file")]):
             raise ValueError("You must specify db_file on creation or when connecting")
@@ -60,6 +93,9 @@ class DB:
                 self.engine_file and self.engine_file != db_file
             ):
                 raise ValueError("Cannot overwrite existing db_file, create a new DB object")
+            elif getattr(self, "session", None):
+                # already connected to db_file
+                return
         elif getattr(self, "session", None):
             # use existing session, maybe give a warning?
             return
@@ -67,14 +103,19 @@ class DB:
             self.db_file = db_file
 
         assert self.db_file, f"self.db_file still unset: received db_file={db_file}"
+        if pragmas:
+            self.pragmas = validate_pragmas(pragmas)
         self._init_session(echo_sql)
 
     def try_commit(self, do_breakpoint: bool = False):
-        """try/except session.commit with optional breakpoint for SQLAlchemyErrors"""
+        """
+        try/except session.commit with optional breakpoint for SQLAlchemyErrors, which are raised
+        instead if not interactive
+        """
         try:
             self.session.commit()
         except SQLAlchemyError as e:
-            if do_breakpoint:
+            if do_breakpoint and self.interactive:
                 logging.exception(e)
                 breakpoint()
                 self.session.rollback()
@@ -85,13 +126,54 @@ class DB:
     def create_db(self):
         self.metadata.create_all(self.engine)
 
+    def migrate(self):
+        """creates the database, or upgrades it in place, to SCHEMA_VERSION"""
+        with self.engine.begin() as conn:
+            version = conn.exec_driver_sql("PRAGMA user_version").scalar()
+            if version == SCHEMA_VERSION:
+                return
+            elif version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"{self.db_file} has schema version {version}, but this version of timesheet "
+                    f"only supports up to {SCHEMA_VERSION}. Please upgrade timesheet."
+                )
+
+            if not inspect(conn).get_table_names():
+                logging.info(f"creating new database {self.db_file}")
+                self.metadata.create_all(conn)
+            else:
+                for new_version in range(version + 1, SCHEMA_VERSION + 1):
+                    logging.info(f"upgrading {self.db_file} to schema version {new_version}")
+                    MIGRATIONS[new_version](conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
     def disconnect(self):
         if hasattr(self, "session"):
             self.session.close()
 
     def _ensure_db(self):
+        # the schema itself is checked by migrate() on connecting
         assert (
             getattr(self, "session", None) is not None and getattr(self, "engine", None) is not None
         )
-        if not all([self.engine.has_table(t.name) for t in self.metadata.sorted_tables]):
-            self.create_db()
+
+
+def validate_pragmas(pragmas: Pragmas) -> Pragmas:
+    """makes sure pragmas are safe to put in a PRAGMA statement"""
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"Invalid sqlite pragma: {name} = {value}")
+    return dict(pragmas)
+
+
+def add_cache_tables(conn: Connection):
+    """adds the tables caching log activity and daily flex balances"""
+    tables = [Activity, FlexDaily, LogIndex, LogWatermark]
+    Base.metadata.create_all(conn, tables=[t.__table__ for t in tables])
+
+
+# MIGRATIONS[n] upgrades a database from schema version n - 1 to n
+MIGRATIONS: dict[int, Callable[[Connection], None]] = {
+    # version 0 is anything from before schema versions were tracked
+    1: add_cache_tables,
+}
@@ -48,6 +48,12 @@ class PrintFormat(NamedEnum):
 # )
 
 
+class SourceType(NamedEnum):
+    syslog = auto()
+    journal = auto()
+    directory = auto()
+
+
 class LogType(NamedEnum):
     IN = "clock_in"
     OUT = "clock_out"
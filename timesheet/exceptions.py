@@ -1,8 +1,10 @@
 import datetime as DT
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
-from .models import Timesheet
+if TYPE_CHECKING:
+    # models pulls in sqlalchemy, which the cli only needs once a command runs
+    from .models import Timesheet
 
 
 class NoData(Exception):
@@ -20,7 +22,7 @@ class NoData(Exception):
 class ExistingData(Exception):
     def __init__(
         self,
-        target: Tuple[Timesheet, str],
+        target: Tuple["Timesheet", str],
         value: Union[DT.time, bool],
         message: Optional[str] = None,
     ):
@@ -36,3 +38,7 @@ class ExistingData(Exception):
     @property
     def old_value(self) -> Union[DT.time, bool]:
         return getattr(*self.target)
+
+
+class RunLocally(Exception):
+    """raised by `timesheet serve` for commands it can't run, so the client runs them itself"""
@@ -0,0 +1,77 @@
+import datetime as DT
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+from .constants import ONE_DAY
+
+
+class FlexDay(NamedTuple):
+    date: DT.date
+    # seconds of flex gained on the day
+    net: int
+    # seconds of flex at the start of the day
+    balance: int
+    missing: bool
+
+
+class FlexLedger:
+    """
+    net flex seconds for every day in [start, end), along with the balances set with
+    `timesheet balance set`. the balance on any day is the latest balance set on or before it plus
+    everything gained since. running totals of the nets are kept, so the flex gained over any range
+    is O(1), and the balance on any day is O(log n) in the number of balances set.
+    """
+
+    def __init__(
+        self,
+        start: DT.date,
+        nets: Sequence[int],
+        anchors: dict[DT.date, int],
+        missing: Optional[set[DT.date]] = None,
+    ):
+        self.start = start
+        self.end = start + len(nets) * ONE_DAY
+        self.missing = missing or set()
+        self._nets = list(nets)
+        # _sums[i] is the sum of _nets[:i]
+        self._sums = list(accumulate(self._nets, initial=0))
+        self._anchors = anchors
+        self._anchor_days = sorted(anchors)
+
+    def __repr__(self) -> str:
+        return f"<FlexLedger start={self.start} end={self.end} anchors={len(self._anchors)}>"
+
+    def _idx(self, day: DT.date) -> int:
+        return (day - self.start).days
+
+    def net(self, day: DT.date) -> int:
+        idx = self._idx(day)
+        return self._nets[idx] if 0 <= idx < len(self._nets) else 0
+
+    def gained(self, from_day: DT.date, until_day: DT.date) -> int:
+        """returns the net flex seconds gained over [from_day, until_day)"""
+        start = min(max(self._idx(from_day), 0), len(self._nets))
+        end = min(max(self._idx(until_day), 0), len(self._nets))
+        return self._sums[end] - self._sums[start]
+
+    def balance(self, day: DT.date) -> Optional[int]:
+        """returns the balance at the start of day, or None if no balance was set on or before it"""
+        pos = bisect_right(self._anchor_days, day)
+        if pos == 0:
+            return None
+        anchor_day = self._anchor_days[pos - 1]
+        return self._anchors[anchor_day] + self.gained(anchor_day, day)
+
+    def series(self, from_day: DT.date, until_day: DT.date) -> Iterator[FlexDay]:
+        """yields each day in [from_day, until_day) that has a balance"""
+        if not self._anchor_days:
+            return
+        day = max(from_day, self._anchor_days[0])
+        balance = self.balance(day) or 0
+        while day < until_day:
+            balance = self._anchors.get(day, balance)
+            net = self.net(day)
+            yield FlexDay(day, net, balance, day in self.missing)
+            balance += net
+            day += ONE_DAY
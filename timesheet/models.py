@@ -1,7 +1,19 @@
 import datetime
-from typing import TYPE_CHECKING, Literal, Union
-
-from sqlalchemy import Boolean, Column, Date, MetaData, PrimaryKeyConstraint, String, Time
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, NamedTuple, Optional, Union
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    MetaData,
+    PrimaryKeyConstraint,
+    String,
+    Time,
+)
 
 if TYPE_CHECKING:
     # sqlalchemy-stubs doesn't support 1.4+, but sqlalchemy2-stubs is still missing a lot
@@ -14,7 +26,7 @@ else:
 from sqlalchemy.sql.sqltypes import Integer
 
 from .enums import LogType
-from .util import Log
+from .util import AuthLog, Log
 
 md: MetaData = MetaData()
 Base = declarative_base()
@@ -56,6 +68,25 @@ class Timesheet(Base):
         return Log(self.date, log_type, log_val)
 
 
+class TimesheetRow(NamedTuple):
+    """read-only timesheet entry, for reports that don't need full ORM objects"""
+
+    date: datetime.date
+    clock_in: Optional[datetime.time]
+    clock_out: Optional[datetime.time]
+    project: Optional[str]
+    is_flex: bool
+    is_pto: bool
+
+    # printed the same as Timesheet
+    __str__ = Timesheet.__str__
+    log = Timesheet.log
+
+    @classmethod
+    def columns(cls) -> list[Column]:
+        return [getattr(Timesheet, field) for field in cls._fields]
+
+
 class Holiday(Base):
     __tablename__ = "holidays"
 
@@ -96,3 +127,102 @@ class FlexBalance(Base):
     def from_timedelta(cls, dt: datetime.date, bal_dt: datetime.timedelta) -> "FlexBalance":
         secs = bal_dt.seconds + bal_dt.days * 86400
         return cls(date=dt, seconds=secs)
+
+
+class FlexDaily(Base):
+    """
+    running flex balance at the end of each work day, continuing from the latest FlexBalance
+
+    rows are deleted from a day onward whenever anything that could change them is edited, and
+    filled back in the next time a balance is requested. config_key records the settings they
+    were calculated with.
+    """
+
+    __tablename__ = "flexdaily"
+
+    date = Column(Date, primary_key=True)
+    # seconds worked minus day_length, 0 on PTO days and days missing an entry
+    net = Column(Integer, nullable=False)
+    balance = Column(Integer, nullable=False)
+    missing = Column(Boolean, nullable=False, default=False)
+    config_key = Column(String, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<FlexDaily date={self.date} net={self.net} balance={self.balance} missing={self.missing}>"
+
+
+class LogIndex(Base):
+    """
+    caches the date range of each auth log so unchanged files don't need to be rescanned
+
+    a file is considered unchanged if its inode, size and mtime all match the cached values
+    """
+
+    __tablename__ = "logindex"
+
+    path = Column(String, primary_key=True)
+    inode = Column(Integer, nullable=False)
+    size = Column(Integer, nullable=False)
+    mtime_ns = Column(Integer, nullable=False)
+    min_date = Column(Date, nullable=False)
+    max_date = Column(Date, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<LogIndex path={self.path!r} inode={self.inode} size={self.size} min_date={self.min_date} max_date={self.max_date}>"
+
+    def matches(self, stat: os.stat_result) -> bool:
+        return (self.inode, self.size, self.mtime_ns) == (
+            stat.st_ino,
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    def update(self, stat: os.stat_result, min_date: datetime.date, max_date: datetime.date):
+        self.inode = stat.st_ino
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.min_date = min_date
+        self.max_date = max_date
+
+    @property
+    def authlog(self) -> AuthLog:
+        return AuthLog(Path(self.path), self.min_date, self.max_date)
+
+
+class Activity(Base):
+    """
+    login/logout events parsed from system logs
+
+    events are unique on timestamp and type, so re-reading a log never creates duplicates
+    """
+
+    __tablename__ = "activity"
+    __table_args__ = (PrimaryKeyConstraint("timestamp", "type"),)
+
+    timestamp = Column(DateTime, nullable=False)
+    type = Column(Enum(LogType), nullable=False)
+    source = Column(String)
+
+    def __repr__(self) -> str:
+        return f"<Activity timestamp={self.timestamp} type={self.type} source={self.source!r}>"
+
+
+class LogWatermark(Base):
+    """
+    tracks how much of each log file has been read into the activity table
+
+    plain logs are identified by device and inode, so reading resumes from the same offset after
+    the file is rotated from auth.log to auth.log.1. gzipped logs are never modified, so they're
+    identified by their CRC32/ISIZE trailer and only read once.
+    """
+
+    __tablename__ = "logwatermark"
+
+    file_id = Column(String, primary_key=True)
+    path = Column(String, nullable=False)
+    offset = Column(Integer, nullable=False)
+    head_hash = Column(String, nullable=False)
+    matcher_key = Column(String, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<LogWatermark file_id={self.file_id!r} path={self.path!r} offset={self.offset}>"
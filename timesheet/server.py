@@ -0,0 +1,163 @@
+import datetime as DT
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from typing import Any, Optional
+
+import click
+
+from . import app
+from .client import CONFIG_ENV
+from .constants import TODAY
+from .exceptions import RunLocally
+from .util import LOG_FORMAT
+
+Response = dict[str, Any]
+RUN_LOCALLY: Response = {"run_locally": True}
+
+
+class NoInput(io.TextIOBase):
+    """stdin for served commands. prompts need the client's terminal, so they're rerun there"""
+
+    def read(self, size: Optional[int] = -1) -> str:
+        raise RunLocally("command is reading input")
+
+    def readline(self, size: Optional[int] = -1) -> str:
+        raise RunLocally("command is reading input")
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    server: "CommandServer"
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line.strip():
+            # e.g., checking if the server is running
+            return
+        request = json.loads(line)
+        response = self.server.run_command(request)
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class CommandServer(socketserver.UnixStreamServer):
+    """
+    runs commands sent by timesheet.client in this process, so they don't pay for startup and keep
+    the database connection and caches warm between commands. handles one command at a time.
+    """
+
+    def __init__(
+        self, socket_file: Path, commands: dict[str, click.Command], config_file: Optional[Path]
+    ):
+        self.commands = commands
+        self.config_file = config_file
+        self.restart = False
+        self._db_stat = db_stat()
+        super().__init__(str(socket_file), CommandHandler)
+
+    def run_command(self, request: Response) -> Response:
+        if DT.date.today() != TODAY:
+            # TODAY etc. are set on import, so start again with fresh ones
+            self.restart = True
+            return RUN_LOCALLY
+        config = request.get("config")
+        if (Path(request["cwd"], config).resolve() if config else None) != self.config_file:
+            return RUN_LOCALLY
+
+        os.chdir(request["cwd"])
+        if config:
+            os.environ[CONFIG_ENV] = config
+        else:
+            os.environ.pop(CONFIG_ENV, None)
+        if db_stat() != self._db_stat:
+            # changed by something else, e.g., `timesheet watch`
+            app.holiday_dates.cache_clear()
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        root_logger = logging.getLogger()
+        log_handlers, log_level = root_logger.handlers, root_logger.level
+        log_handler = logging.StreamHandler(stderr)
+        log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root_logger.handlers = [log_handler]
+        stdin, sys.stdin = sys.stdin, NoInput()
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                self.commands[request["prog"]].main(request["args"], prog_name=request["prog"])
+            exit_code = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=stderr)
+                exit_code = 1
+        except RunLocally as e:
+            logging.debug(f"running command in the client: {e}")
+            return RUN_LOCALLY
+        except Exception:
+            traceback.print_exc(file=stderr)
+            exit_code = 1
+        finally:
+            sys.stdin = stdin
+            # anything not yet committed by a command that's rerun in the client is thrown away
+            app.db.session.remove()
+            root_logger.handlers, root_logger.level = log_handlers, log_level
+            self._db_stat = db_stat()
+
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "exit_code": exit_code}
+
+
+def db_stat() -> tuple[int, ...]:
+    """returns the modification time and size of the database and its WAL, if any"""
+    stat: tuple[int, ...] = ()
+    for db_file in (app.db.db_file, Path(f"{app.db.db_file}-wal")):
+        try:
+            file_stat = db_file.stat()
+        except FileNotFoundError:
+            continue
+        stat += (file_stat.st_mtime_ns, file_stat.st_size)
+    return stat
+
+
+def serve_commands(
+    socket_file: Path, commands: dict[str, click.Command], config_file: Optional[Path] = None
+):
+    """runs the commands sent to socket_file until interrupted"""
+    if socket_file.exists():
+        if socket_file.stat().st_uid != os.getuid():
+            raise RuntimeError(f"{socket_file} belongs to another user, use a different --socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(str(socket_file))
+            except OSError:
+                # left behind by a server that didn't exit cleanly
+                socket_file.unlink()
+            else:
+                raise RuntimeError(f"timesheet serve is already running on {socket_file}")
+
+    # errors can't stop in the debugger without a terminal
+    app.db.interactive = False
+    # warm up the connection and holiday cache before the first command
+    app.holiday_dates()
+    # only the current user can send commands
+    umask = os.umask(0o177)
+    try:
+        server = CommandServer(socket_file, commands, config_file)
+    finally:
+        os.umask(umask)
+
+    logging.info(f"listening on {socket_file}")
+    try:
+        while not server.restart:
+            server.handle_request()
+    finally:
+        server.server_close()
+        socket_file.unlink(missing_ok=True)
+
+    logging.info("date changed, restarting")
+    os.execv(sys.executable, [sys.executable, *sys.argv])
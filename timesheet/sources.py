@@ -0,0 +1,300 @@
+import datetime as DT
+import gzip
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from .enums import LogType, SourceType
+from .util import ActivityMatcher, log_date, read_log_bounds
+
+Event = tuple[DT.datetime, LogType]
+# events collected before a batch is handed back to the caller
+BATCH_SIZE = 10000
+# `journalctl -o export` field names
+JOURNAL_FIELD = re.compile(rb"^[A-Z0-9_]+=")
+# traditional or RFC3339 syslog timestamps
+SYSLOG_PREFIX = re.compile(rb"^([A-Z][a-z]{2} [ \d]\d \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT) ")
+
+
+class ActivitySource(ABC):
+    """
+    somewhere login/logout activity can be read from, made up of files in log_dir matching log_glob
+
+    files are read from a byte offset onwards, so they can be tracked with LogIndex / LogWatermark
+    """
+
+    default_glob = "*"
+
+    def __init__(self, log_dir: Path, log_glob: Optional[str] = None):
+        self.log_dir = log_dir
+        self.log_glob = log_glob or self.default_glob
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} log_dir={str(self.log_dir)!r} log_glob={self.log_glob!r}>"
+
+    def files(self) -> list[Path]:
+        return sorted(f for f in self.log_dir.glob(self.log_glob) if f.is_file())
+
+    @abstractmethod
+    def read(
+        self, logfile: Path, offset: int, match_activity: ActivityMatcher
+    ) -> Iterator[tuple[list[Event], int]]:
+        """
+        yields batches of login/logout events in logfile after byte offset, along with the offset
+        just past the last entry in each batch. entries still being written are left for next time.
+        """
+
+    def read_all(
+        self, logfile: Path, offset: int, match_activity: ActivityMatcher
+    ) -> tuple[list[Event], int]:
+        """returns every event from read() in a single batch"""
+        events: list[Event] = []
+        for batch, offset in self.read(logfile, offset, match_activity):
+            events.extend(batch)
+        return events, offset
+
+    @abstractmethod
+    def bounds(self, logfile: Path) -> Optional[tuple[DT.date, DT.date]]:
+        """returns the dates of the first and last entries in logfile, or None if it's empty"""
+
+
+class SyslogSource(ActivitySource):
+    """rotated syslog text files, e.g., /var/log/auth.log*"""
+
+    default_glob = "auth.log*"
+
+    def read(
+        self, logfile: Path, offset: int, match_activity: ActivityMatcher
+    ) -> Iterator[tuple[list[Event], int]]:
+        today = DT.date.today()
+        is_gzip = logfile.name.endswith(".gz")
+        events: list[Event] = []
+        with open_binary(logfile) as logs:
+            logs.seek(offset)
+            for raw_line in logs:
+                if not is_gzip and not raw_line.endswith(b"\n"):
+                    # line still being written, pick it up next time
+                    break
+                offset += len(raw_line)
+                log_line = raw_line.decode(errors="replace")
+                log_type = match_activity(log_line)
+                if log_type is None:
+                    continue
+                events.append((log_date(log_line, today), log_type))
+                if len(events) >= BATCH_SIZE:
+                    yield events, offset
+                    events = []
+        yield events, offset
+
+    def bounds(self, logfile: Path) -> Optional[tuple[DT.date, DT.date]]:
+        log_bounds = read_log_bounds(logfile)
+        if log_bounds is None:
+            return None
+        first_line, last_line = log_bounds
+        today = DT.date.today()
+        return log_date(first_line, today).date(), log_date(last_line, today).date()
+
+
+class JournalSource(ActivitySource):
+    """
+    systemd journal dumps from `journalctl -o export` or `journalctl -o json`
+
+    entries carry their own microsecond realtime timestamps, so no dates need to be parsed
+    """
+
+    def read(
+        self, logfile: Path, offset: int, match_activity: ActivityMatcher
+    ) -> Iterator[tuple[list[Event], int]]:
+        is_gzip = logfile.name.endswith(".gz")
+        events: list[Event] = []
+        with open_binary(logfile) as logs:
+            if is_json_journal(logs):
+                entries = iter_json_entries(logs, offset, is_gzip)
+            else:
+                entries = iter_export_entries(logs, offset, is_gzip)
+            for timestamp, message, offset in entries:
+                log_type = match_activity(message)
+                if log_type is None:
+                    continue
+                events.append((timestamp, log_type))
+                if len(events) >= BATCH_SIZE:
+                    yield events, offset
+                    events = []
+        yield events, offset
+
+    def bounds(self, logfile: Path) -> Optional[tuple[DT.date, DT.date]]:
+        with open_binary(logfile) as logs:
+            if is_json_journal(logs):
+                # one entry per line, so only the ends of the file are needed
+                log_bounds = read_log_bounds(logfile)
+                if log_bounds is None:
+                    return None
+                first_line, last_line = log_bounds
+                return (
+                    json_entry_timestamp(json.loads(first_line)).date(),
+                    json_entry_timestamp(json.loads(last_line)).date(),
+                )
+
+            first_ts = last_ts = None
+            for timestamp, _, _ in iter_export_entries(logs, 0, True):
+                if first_ts is None:
+                    first_ts = timestamp
+                last_ts = timestamp
+        if first_ts is None or last_ts is None:
+            return None
+        return first_ts.date(), last_ts.date()
+
+
+class DirectorySource(ActivitySource):
+    """
+    every file in a directory, e.g., logs archived from other hosts. each file can be syslog text
+    or a journal dump, and is read by the matching source. anything else is skipped.
+    """
+
+    def files(self) -> list[Path]:
+        log_files = []
+        for logfile in super().files():
+            if self._file_source(logfile):
+                log_files.append(logfile)
+            else:
+                logging.warning(f"Unrecognized log format in {logfile}, skipping")
+        return log_files
+
+    def read(
+        self, logfile: Path, offset: int, match_activity: ActivityMatcher
+    ) -> Iterator[tuple[list[Event], int]]:
+        return self._source(logfile).read(logfile, offset, match_activity)
+
+    def bounds(self, logfile: Path) -> Optional[tuple[DT.date, DT.date]]:
+        return self._source(logfile).bounds(logfile)
+
+    def _source(self, logfile: Path) -> ActivitySource:
+        file_source = self._file_source(logfile)
+        if file_source is None:
+            raise ValueError(f"Unrecognized log format in {logfile}")
+        return file_source
+
+    def _file_source(self, logfile: Path) -> Optional[ActivitySource]:
+        try:
+            with open_binary(logfile) as logs:
+                first_line = logs.readline()
+        except (OSError, EOFError):
+            # includes bad gzip files
+            return None
+        if first_line.startswith(b"{") or JOURNAL_FIELD.match(first_line):
+            return JournalSource(self.log_dir, self.log_glob)
+        elif SYSLOG_PREFIX.match(first_line):
+            return SyslogSource(self.log_dir, self.log_glob)
+        return None
+
+
+SOURCES: dict[SourceType, type[ActivitySource]] = {
+    SourceType.syslog: SyslogSource,
+    SourceType.journal: JournalSource,
+    SourceType.directory: DirectorySource,
+}
+
+
+def get_source(
+    source_type: SourceType, log_dir: Path, log_glob: Optional[str] = None
+) -> ActivitySource:
+    return SOURCES[source_type](log_dir, log_glob)
+
+
+def open_binary(logfile: Path) -> BinaryIO:
+    if logfile.name.endswith(".gz"):
+        return gzip.open(logfile, "rb")  # type: ignore
+    return logfile.open("rb")
+
+
+def is_json_journal(logs: BinaryIO) -> bool:
+    pos = logs.tell()
+    logs.seek(0)
+    first_line = logs.readline()
+    logs.seek(pos)
+    return first_line.lstrip().startswith(b"{")
+
+
+def realtime_timestamp(usec: int) -> DT.datetime:
+    """converts a journal __REALTIME_TIMESTAMP to naive local time"""
+    return DT.datetime.fromtimestamp(usec // 1_000_000).replace(microsecond=usec % 1_000_000)
+
+
+def json_entry_timestamp(entry: dict) -> DT.datetime:
+    return realtime_timestamp(int(entry["__REALTIME_TIMESTAMP"]))
+
+
+def iter_json_entries(
+    logs: BinaryIO, offset: int, complete: bool
+) -> Iterator[tuple[DT.datetime, str, int]]:
+    """
+    yields the timestamp, message and ending offset of each `journalctl -o json` entry after offset
+
+    a partly written last line is only read if complete is set
+    """
+    logs.seek(offset)
+    for raw_line in logs:
+        if not complete and not raw_line.endswith(b"\n"):
+            break
+        offset += len(raw_line)
+        if not raw_line.strip():
+            continue
+        entry = json.loads(raw_line)
+        message = entry.get("MESSAGE")
+        if not isinstance(message, str):
+            # binary messages are arrays of bytes
+            if not isinstance(message, list):
+                continue
+            message = bytes(message).decode(errors="replace")
+        yield json_entry_timestamp(entry), message, offset
+
+
+def iter_export_entries(
+    logs: BinaryIO, offset: int, complete: bool
+) -> Iterator[tuple[DT.datetime, str, int]]:
+    """
+    yields the timestamp, message and ending offset of each `journalctl -o export` entry after
+    offset. entries are separated by blank lines, and fields are either KEY=value lines or binary
+    fields: KEY, a newline, the data size as a little-endian 64 bit int, the data and a newline.
+
+    a partly written last line is only read if complete is set
+    """
+    logs.seek(offset)
+    fields: dict[bytes, bytes] = {}
+    while True:
+        raw_line = logs.readline()
+        if not raw_line or (not complete and not raw_line.endswith(b"\n")):
+            break
+        offset += len(raw_line)
+        if raw_line == b"\n":
+            if fields:
+                entry = _export_entry(fields)
+                if entry:
+                    yield (*entry, offset)
+                fields = {}
+        elif b"=" in raw_line:
+            key, value = raw_line.rstrip(b"\n").split(b"=", 1)
+            fields[key] = value
+        else:
+            size = logs.read(8)
+            value = logs.read(int.from_bytes(size, "little"))
+            # plus the trailing newline
+            offset += len(size) + len(value) + len(logs.read(1))
+            fields[raw_line.rstrip(b"\n")] = value
+
+    # the last entry doesn't always get a trailing blank line
+    if fields and complete:
+        entry = _export_entry(fields)
+        if entry:
+            yield (*entry, offset)
+
+
+def _export_entry(fields: dict[bytes, bytes]) -> Optional[tuple[DT.datetime, str]]:
+    if b"__REALTIME_TIMESTAMP" not in fields:
+        logging.debug(f"skipping journal entry without a timestamp: {fields}")
+        return None
+    timestamp = realtime_timestamp(int(fields[b"__REALTIME_TIMESTAMP"]))
+    return timestamp, fields.get(b"MESSAGE", b"").decode(errors="replace")
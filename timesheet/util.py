@@ -1,15 +1,47 @@
 import datetime as DT
+import gzip
+import hashlib
 import logging
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Generator, Literal, NamedTuple, Optional, Union, overload
+from typing import (
+    BinaryIO,
+    Generator,
+    Iterable,
+    Literal,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+    overload,
+)
 
 import click
 from click.exceptions import BadParameter
 
-from .constants import ONE_DAY, TODAY, TOMORROW, YESTERDAY
+from .constants import DAY_MINUTES, ONE_DAY, TODAY, TOMORROW, YESTERDAY
 from .enums import AllTargets, LogType, Month, StrToEnum, TargetDay, TargetPeriod
 from .types import OptionalDate, TimeDatetime
 
+# syslog month abbreviations, independent of the current locale
+MONTH_ABBRS = {
+    abbr: num
+    for num, abbr in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1
+    )
+}
+
+# ics durations in whole days / weeks, e.g., P2D, P1W
+ICS_DAYS = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?")
+ICS_ESCAPES = re.compile(r"\\([\\;,nN])")
+
+# bytes read at a time when looking for the last line of a log
+TAIL_BLOCK_SIZE = 8192
+# bytes at the start of a log hashed to make sure it's the same file as last time
+HEAD_HASH_SIZE = 1024
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
 
 @overload
 def clean_time(dt_obj: DT.datetime) -> DT.datetime:
@@ -32,46 +64,317 @@ def date_range(start: DT.date, end: DT.date) -> Generator[DT.date, None, None]:
         start += ONE_DAY
 
 
-def init_logs(log_level: int = logging.INFO, force: bool = False):
-    logging.basicConfig(
-        format="%(asctime)s [%(levelname)s] %(message)s",
-        level=log_level,
-        force=force,
-    )
+def init_logs(log_level: Optional[int] = logging.INFO, force: bool = False):
+    logging.basicConfig(format=LOG_FORMAT, level=log_level, force=force)
+    # basicConfig leaves existing handlers alone, e.g., in `timesheet serve`, but still set the level
+    if log_level is not None:
+        logging.getLogger().setLevel(log_level)
+
 
+def log_date(log_line: str, today: Optional[DT.date] = None) -> DT.datetime:
+    """
+    parses the timestamp at the start of a syslog line
 
-def log_date(log_line: str) -> DT.datetime:
-    (month, day, clock, _) = log_line.split(None, 3)
+    handles the traditional `Mon DD HH:MM:SS` prefix and the RFC3339 timestamps written by rsyslog's
+    high precision templates. traditional timestamps don't include a year, so it's inferred from
+    today (which callers parsing many lines should pass in).
+    """
     try:
-        dt = DT.datetime.strptime(
-            f"{DT.date.today().year} {month} {day:0>2} {clock}",
-            "%Y %b %d %H:%M:%S",
-        )
-    except ValueError as e:
-        if "does not match format" in str(e):
-            logging.error(f"Could not parse date from log_line: '{log_line}'")
-            logging.exception(e)
-            exit(1)
+        if log_line[4:5] == "-" and log_line[10:11] == "T":
+            return _rfc3339_date(log_line.split(None, 1)[0])
+
+        if today is None:
+            today = DT.date.today()
+        if log_line[6:7] == " " and log_line[9:10] == ":":
+            # fixed width: "Jan  2 03:04:05"
+            month, day, clock = log_line[:3], log_line[4:6], log_line[7:15]
         else:
-            raise e
+            month, day, clock = log_line.split(None, 3)[:3]
+        log_day = _syslog_day(month, day, today)
+        hour, minute, second = int(clock[:2]), int(clock[3:5]), int(clock[6:8])
+        return DT.datetime(log_day.year, log_day.month, log_day.day, hour, minute, second)
+    except (KeyError, ValueError) as e:
+        logging.error(f"Could not parse date from log_line: '{log_line}'")
+        logging.exception(e)
+        exit(1)
+
+
+@lru_cache(maxsize=1024)
+def _syslog_day(month: str, day: str, today: DT.date) -> DT.date:
+    month_num = MONTH_ABBRS[month]
+    day_num = int(day)
+    # no year in the timestamp, so anything that would be in the future must be from last year.
+    # e.g., Dec 31 lines read on Jan 1
+    year = today.year
+    if (month_num, day_num) > (today.month, today.day):
+        year -= 1
+    if (month_num, day_num) == (2, 29):
+        # must be from the last leap year, e.g., an old rotated log read in a non-leap year. same as
+        # calendar.isleap, which is slow to import for `clock`
+        while year % 4 or (year % 100 == 0 and year % 400):
+            year -= 1
+    return DT.date(year, month_num, day_num)
+
+
+def _rfc3339_date(timestamp: str) -> DT.datetime:
+    # fromisoformat doesn't accept Z until python 3.11
+    if timestamp.endswith("Z"):
+        timestamp = f"{timestamp[:-1]}+00:00"
+    dt = DT.datetime.fromisoformat(timestamp)
+    if dt.tzinfo:
+        # everything else is naive local time
+        dt = dt.astimezone().replace(tzinfo=None)
     return dt
 
 
+def gzip_trailer(logfile: Path) -> bytes:
+    """returns the CRC32 and ISIZE trailer of the last member of a gzip file"""
+    with logfile.open("rb") as raw:
+        raw.seek(-8, 2)
+        return raw.read(8)
+
+
+def log_file_id(logfile: Path) -> str:
+    """returns an id for logfile that stays the same across rotations"""
+    if logfile.name.endswith(".gz"):
+        return f"gzip:{gzip_trailer(logfile).hex()}"
+    stat = logfile.stat()
+    return f"inode:{stat.st_dev}:{stat.st_ino}"
+
+
+def head_hash(logfile: Union[Path, BinaryIO], size: int) -> str:
+    """returns a hash of the first `size` bytes of logfile, up to HEAD_HASH_SIZE"""
+    if isinstance(logfile, Path):
+        with logfile.open("rb") as fh:
+            return head_hash(fh, size)
+
+    pos = logfile.tell()
+    logfile.seek(0)
+    head = logfile.read(min(size, HEAD_HASH_SIZE))
+    logfile.seek(pos)
+    return hashlib.sha1(head).hexdigest()
+
+
+def read_log_bounds(logfile: Path) -> Optional[tuple[str, str]]:
+    """
+    returns the first and last non-empty lines of a plain or gzipped log, or None if it's empty.
+    an unfinished last line in a plain log is skipped, it's still being written
+
+    plain files are read backwards from the end in blocks. gzip files can't seek backwards without
+    decompressing from the start, so the ISIZE trailer is used to skip ahead to the last block.
+    """
+    if logfile.name.endswith(".gz"):
+        isize = int.from_bytes(gzip_trailer(logfile)[4:], "little")
+        with gzip.open(logfile, "rb") as fh:
+            first_line = _head_line(fh)  # type: ignore
+            last_line = _gzip_tail_line(fh, isize) if first_line else None  # type: ignore
+    else:
+        with logfile.open("rb") as fh:
+            first_line = _head_line(fh)
+            last_line = _tail_line(fh, logfile.stat().st_size) if first_line else None
+
+    if first_line is None or last_line is None:
+        return None
+    return first_line.decode(), last_line.decode()
+
+
+def _head_line(fh: BinaryIO) -> Optional[bytes]:
+    for line in fh:
+        if line.strip():
+            return line
+    return None
+
+
+def _split_last_line(buf: bytes, at_start: bool) -> Optional[bytes]:
+    """returns the last complete non-empty line in buf, if there is one"""
+    lines = buf.rstrip().rsplit(b"\n", 1)
+    if len(lines) == 2 or at_start:
+        return lines[-1] or None
+    return None
+
+
+def _tail_line(fh: BinaryIO, size: int) -> Optional[bytes]:
+    pos = size
+    buf = b""
+    complete = False
+    while pos > 0:
+        step = min(TAIL_BLOCK_SIZE, pos)
+        pos -= step
+        fh.seek(pos)
+        buf = fh.read(step) + buf
+        if not complete:
+            # anything after the last newline is still being written, same as SyslogSource.read
+            line_end = buf.rfind(b"\n")
+            if line_end == -1:
+                continue
+            buf = buf[: line_end + 1]
+            complete = True
+        last_line = _split_last_line(buf, pos == 0)
+        if last_line is not None:
+            return last_line
+    return None
+
+
+def _gzip_tail_line(fh: gzip.GzipFile, isize: int) -> Optional[bytes]:
+    # ISIZE is the size of the last gzip member mod 2**32, so it can only ever undershoot the
+    # actual size. keep reading until EOF, but only hold on to the last couple of blocks.
+    fh.seek(max(isize - TAIL_BLOCK_SIZE, 0))
+    tail = b""
+    while chunk := fh.read(TAIL_BLOCK_SIZE):
+        tail = tail[-TAIL_BLOCK_SIZE:] + chunk
+    at_start = fh.tell() == len(tail)
+    last_line = _split_last_line(tail, at_start)
+    if last_line is None and not at_start:
+        # a single line longer than the tail, just read the whole thing
+        fh.seek(0)
+        last_line = _split_last_line(fh.read(), True)
+    return last_line
+
+
+class ActivityMatcher:
+    """classifies log lines as logins, logouts or neither with a single precompiled regex"""
+
+    def __init__(self, login_strs: Sequence[str], logout_strs: Sequence[str]):
+        self.login_strs = tuple(login_strs)
+        self.logout_strs = tuple(logout_strs)
+        groups = []
+        for log_type, log_strs in [(LogType.IN, self.login_strs), (LogType.OUT, self.logout_strs)]:
+            if log_strs:
+                groups.append(f"(?P<{log_type.name}>{'|'.join(map(re.escape, log_strs))})")
+        # never matches anything if there's nothing to look for
+        self.pattern = re.compile("|".join(groups) or "(?!)")
+
+    @property
+    def key(self) -> str:
+        """identifies the strings being matched, to tell if logs need to be re-read"""
+        return hashlib.sha1(self.pattern.pattern.encode()).hexdigest()
+
+    def __repr__(self) -> str:
+        return f"<ActivityMatcher login_strs={self.login_strs} logout_strs={self.logout_strs}>"
+
+    def __call__(self, log_line: str) -> Optional[LogType]:
+        match = self.pattern.search(log_line)
+        if match is None:
+            return None
+        return LogType[match.lastgroup]  # type: ignore
+
+
+@lru_cache(maxsize=None)
+def get_activity_matcher(
+    login_strs: tuple[str, ...], logout_strs: tuple[str, ...]
+) -> ActivityMatcher:
+    return ActivityMatcher(login_strs, logout_strs)
+
+
+def unfold_ics(cal: Iterable[str]) -> Generator[str, None, None]:
+    """yields the logical lines of an ics file, joining RFC 5545 folded lines back together"""
+    line = None
+    for raw_line in cal:
+        raw_line = raw_line.rstrip("\r\n")
+        if raw_line[:1] in (" ", "\t"):
+            # continuation of the previous line
+            line = (line or "") + raw_line[1:]
+            continue
+        if line is not None:
+            yield line
+        line = raw_line
+    if line:
+        yield line
+
+
+def iter_ics_events(cal: Iterable[str]) -> Generator[dict[str, str], None, None]:
+    """
+    yields the properties of each VEVENT in an ics file as {name: value}, without any parameters
+    (e.g., DTSTART;VALUE=DATE:20210101 -> {"DTSTART": "20210101"}). properties of components
+    nested in the event, like VALARMs, are skipped.
+    """
+    event: Optional[dict[str, str]] = None
+    depth = 0
+    for line in unfold_ics(cal):
+        if ":" not in line:
+            continue
+        name_params, value = line.split(":", 1)
+        name = name_params.split(";", 1)[0].upper()
+        if event is None:
+            if name == "BEGIN" and value.strip().upper() == "VEVENT":
+                event = {}
+                depth = 0
+        elif name == "BEGIN":
+            depth += 1
+        elif name == "END":
+            if depth:
+                depth -= 1
+            else:
+                yield event
+                event = None
+        elif depth == 0:
+            event[name] = value.strip()
+
+
+def ics_event_dates(event: dict[str, str]) -> list[DT.date]:
+    """
+    returns every date an ics event covers. DTEND is exclusive, so all day events ending on the
+    next day are one day long, but an event ending partway through a day includes that day.
+    """
+    start = DT.datetime.strptime(event["DTSTART"][:8], "%Y%m%d").date()
+    if "DTEND" in event:
+        end_val = event["DTEND"]
+        end = DT.datetime.strptime(end_val[:8], "%Y%m%d").date()
+        if "T" in end_val and end_val[9:15].strip("0"):
+            end += ONE_DAY
+    elif "DURATION" in event and (match := ICS_DAYS.match(event["DURATION"])):
+        weeks, days = match.groups()
+        end = start + DT.timedelta(weeks=int(weeks or 0), days=int(days or 0))
+    else:
+        end = start
+    return list(date_range(start, max(end, start + ONE_DAY)))
+
+
+def unescape_ics(text: str) -> str:
+    return ICS_ESCAPES.sub(lambda m: "\n" if m.group(1) in "nN" else m.group(1), text)
+
+
 def round_time(time_obj: DT.time, thresh: Optional[int] = None, to_nearest: int = 15) -> DT.time:
+    seconds = time_seconds(time_obj)
+    rounded = round_seconds(seconds, thresh, to_nearest)
+    if rounded == seconds:
+        return time_obj
+    return DT.time(rounded // 3600, rounded // 60 % 60, rounded % 60, time_obj.microsecond)
+
+
+def round_seconds(seconds: int, thresh: Optional[int] = None, to_nearest: int = 15) -> int:
+    """round_time for seconds since midnight"""
+    return rounding_table(to_nearest, thresh)[seconds // 60] * 60 + seconds % 60
+
+
+@lru_cache(maxsize=None)
+def rounding_table(to_nearest: int = 15, thresh: Optional[int] = None) -> tuple[int, ...]:
+    """
+    returns the rounded minute of the day for each minute of the day. minutes past the hour are
+    rounded to a multiple of to_nearest: down if up to thresh (default: half of to_nearest) minutes
+    past it, otherwise up.
+    """
+    if not 0 < to_nearest <= 60:
+        raise ValueError(f"Invalid round_interval {to_nearest}, must be from 1 to 60 minutes")
     if thresh is None:
         thresh = to_nearest // 2
-    mod = time_obj.minute % to_nearest
-    if mod == 0:
-        return time_obj
 
-    if mod <= thresh:
-        rounded_time = DT.timedelta(minutes=-mod)
-    else:
-        rounded_time = DT.timedelta(minutes=to_nearest - mod)
+    table = []
+    for minute in range(DAY_MINUTES):
+        mod = minute % 60 % to_nearest
+        if mod == 0:
+            table.append(minute)
+        elif mod <= thresh:
+            table.append(minute - mod)
+        else:
+            # wraps around at midnight, same as a DT.time
+            table.append((minute + to_nearest - mod) % DAY_MINUTES)
+    return tuple(table)
+
 
-    # throwaway dt object so we can use timedeltas for cleaner time math
-    temp_dt = DT.datetime.combine(TODAY, time_obj) + rounded_time
-    return temp_dt.time()
+def time_seconds(time_obj: DT.time) -> int:
+    """returns seconds since midnight, ignoring microseconds"""
+    return time_obj.hour * 3600 + time_obj.minute * 60 + time_obj.second
 
 
 def dt2date(
@@ -138,16 +441,47 @@ def time_difference(
     t2: DT.time,
     rounded: bool = False,
     round_threshold: Optional[int] = None,
+    round_interval: int = 15,
 ) -> DT.timedelta:
-    if rounded:
-        thresh = round_threshold
-        t1 = round_time(t1, thresh)
-        t2 = round_time(t2, thresh)
-    return abs(
-        DT.datetime.strptime(str(t1), "%H:%M:%S") - DT.datetime.strptime(str(t2), "%H:%M:%S")
+    return DT.timedelta(
+        seconds=seconds_difference(
+            time_seconds(t1), time_seconds(t2), rounded, round_threshold, round_interval
+        )
     )
 
 
+def seconds_difference(
+    s1: int,
+    s2: int,
+    rounded: bool = False,
+    round_threshold: Optional[int] = None,
+    round_interval: int = 15,
+) -> int:
+    """time_difference for seconds since midnight"""
+    if rounded:
+        table = rounding_table(round_interval, round_threshold)
+        s1 = table[s1 // 60] * 60 + s1 % 60
+        s2 = table[s2 // 60] * 60 + s2 % 60
+    return abs(s1 - s2)
+
+
+def seconds_differences(
+    starts: Sequence[int],
+    ends: Sequence[int],
+    rounded: bool = False,
+    round_threshold: Optional[int] = None,
+    round_interval: int = 15,
+) -> list[int]:
+    """seconds_difference for each pair of starts / ends"""
+    if rounded:
+        table = rounding_table(round_interval, round_threshold)
+        return [
+            abs(table[start // 60] * 60 + start % 60 - table[end // 60] * 60 - end % 60)
+            for start, end in zip(starts, ends)
+        ]
+    return [abs(start - end) for start, end in zip(starts, ends)]
+
+
 def validate_datetime(ctx: click.Context, param: click.Parameter, dt: DT.datetime) -> DT.datetime:
     # replace default date on time string parse with today's date
     if dt.date() == DT.date(1900, 1, 1):
@@ -166,3 +500,47 @@ class AuthLog(NamedTuple):
     file: Path
     min_date: DT.date
     max_date: DT.date
+
+
+class DayActivity:
+    """
+    the earliest login and latest logout seen on a day
+
+    adding events is order independent, so they can be reduced in any order
+    """
+
+    __slots__ = ("first_in", "last_out")
+
+    def __init__(self, first_in: Optional[DT.time] = None, last_out: Optional[DT.time] = None):
+        self.first_in = first_in
+        self.last_out = last_out
+
+    def __repr__(self) -> str:
+        return f"<DayActivity first_in={self.first_in} last_out={self.last_out}>"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DayActivity):
+            return NotImplemented
+        return (self.first_in, self.last_out) == (other.first_in, other.last_out)
+
+    def add(self, log_type: LogType, log_time: DT.time):
+        if log_type is LogType.IN:
+            if self.first_in is None or log_time < self.first_in:
+                self.first_in = log_time
+        elif self.last_out is None or log_time > self.last_out:
+            self.last_out = log_time
+
+
+def reduce_activity(
+    events: Iterable[tuple[DT.datetime, LogType]],
+    results: Optional[dict[DT.date, DayActivity]] = None,
+) -> dict[DT.date, DayActivity]:
+    """folds events into the earliest login / latest logout per day, adding to results if given"""
+    if results is None:
+        results = {}
+    for timestamp, log_type in events:
+        day = timestamp.date()
+        if day not in results:
+            results[day] = DayActivity()
+        results[day].add(log_type, clean_time(timestamp.time()))
+    return results
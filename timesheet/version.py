@@ -1,18 +1,31 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union, overload
-
-import pkg_resources
+from typing import Any, Optional, Union, overload
 
 vfile = Path(__file__).parent / "VERSION"
 file_version = vfile.read_text().strip()
-try:
-    # show installed package version, if applicable
-    pkg_version = pkg_resources.require(__package__)[0].version
-    __version__ = pkg_version
-except pkg_resources.DistributionNotFound:
-    # fallback to file_version
-    pkg_version = None
-    __version__ = file_version
+
+
+@lru_cache(maxsize=None)
+def package_version() -> Optional[str]:
+    """installed package version, if applicable"""
+    # importlib.metadata takes longer to import than the rest of the cli, so only load it when needed
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(__package__)
+    except PackageNotFoundError:
+        return None
+
+
+def __getattr__(name: str) -> Any:
+    # pkg_version and __version__ are looked up on first access
+    if name == "pkg_version":
+        return package_version()
+    elif name == "__version__":
+        # fallback to file_version
+        return package_version() or file_version
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @overload
@@ -26,10 +39,11 @@ def get_version(pretty: bool = False) -> tuple[str, str, str, Optional[str]]:
 
 
 def get_version(pretty: bool = False) -> Union[str, tuple[str, str, str, Optional[str]]]:
+    version = package_version() or file_version
     if pretty is True:
-        return f"{__package__} {__version__}"  # type: ignore
+        return f"{__package__} {version}"  # type: ignore
 
-    vstr = __version__[1:] if __version__.startswith("v") else __version__
+    vstr = version[1:] if version.startswith("v") else version
     maj, min, bugfix = vstr.split(".")
     if "." in bugfix:
         bugfix, special = bugfix.split(".", 1)